@@ -1,14 +1,8 @@
 import discord
 from discord.ext import commands
-from pathlib import Path
-import json
+from config_store import SERVER_ROLES
 
-DATA_DIR = Path("data")
-SETTINGS_FILE = DATA_DIR / "server_roles.json"
-
-DATA_DIR.mkdir(exist_ok=True)
-if not SETTINGS_FILE.exists():
-    SETTINGS_FILE.write_text("{}")
+ROLE_KEYS = ("admin_roles", "mod_roles", "help_roles")
 
 
 class Admin(commands.Cog):
@@ -16,25 +10,17 @@ class Admin(commands.Cog):
     """Admin-level server configuration commands"""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.config = self.load_config()
+        self.store = bot.config_store
 
     # -------------------------
     # CONFIG HANDLING
     # -------------------------
-    def load_config(self) -> dict:
-        try:
-            return json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-
-    def save_config(self):
-        SETTINGS_FILE.write_text(json.dumps(self.config, indent=4))
-
     def get_guild_config(self, guild_id: int) -> dict:
-        return self.config.setdefault(
-            str(guild_id),
-            {"admin_roles": [], "mod_roles": [], "help_roles": []},
-        )
+        # Shared with ServerSettings, so only fill in our own keys
+        cfg = self.store.guild(SERVER_ROLES, guild_id)
+        for key in ROLE_KEYS:
+            cfg.setdefault(key, [])
+        return cfg
 
     # -------------------------
     # ADMIN COMMANDS
@@ -50,7 +36,7 @@ class Admin(commands.Cog):
             return
 
         cfg["admin_roles"].append(role.id)
-        self.save_config()
+        self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)  # type: ignore
 
         await ctx.send(f"✅ Admin role added: {role.mention}")
 
@@ -65,7 +51,7 @@ class Admin(commands.Cog):
             return
 
         cfg["mod_roles"].append(role.id)
-        self.save_config()
+        self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)  # type: ignore
 
         await ctx.send(f"✅ Moderator role added: {role.mention}")
 
@@ -80,7 +66,7 @@ class Admin(commands.Cog):
             return
 
         cfg["help_roles"].append(role.id)
-        self.save_config()
+        self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)  # type: ignore
 
         await ctx.send(f"📘 Help access granted to: {role.mention}")
 
@@ -108,8 +94,11 @@ class Admin(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def reset_roles(self, ctx: commands.Context):
         """Reset all role configuration for this server."""
-        self.config.pop(str(ctx.guild.id), None)  # type: ignore
-        self.save_config()
+        cfg = self.store.peek(SERVER_ROLES, ctx.guild.id)  # type: ignore
+        if cfg:
+            for key in ROLE_KEYS:
+                cfg.pop(key, None)
+            self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)  # type: ignore
         await ctx.send("🔄 All role settings have been reset.")
     
 
@@ -0,0 +1,51 @@
+import time
+
+from config_store import NOTIFIER_STATE
+
+MAX_ANNOUNCED = 500   # stream/video IDs remembered per notifier
+OFFLINE_GRACE = 600   # seconds a source may vanish without ending its session
+SEEN_TTL = 86400      # forget last-seen times older than this
+
+
+class AnnouncementLog:
+    """
+    Persisted, bounded record of what a notifier has already announced.
+
+    Keyed by stream/video ID, so a restart or a transient empty API response
+    never re-announces a stream that is still running. A source that comes
+    back with a new ID within `grace` seconds of last being seen live is
+    treated as the same session (e.g. an encoder reconnect) and stays quiet.
+    """
+
+    def __init__(self, store, prefix: str, limit: int = MAX_ANNOUNCED, grace: float = OFFLINE_GRACE):
+        self.store = store
+        self.key = f"{prefix}:announced"
+        self.limit = limit
+        self.grace = grace
+        data = store.state(NOTIFIER_STATE, self.key)
+        self.ids: dict[str, float] = data.setdefault("ids", {})    # item ID -> announced at
+        self.seen: dict[str, float] = data.setdefault("seen", {})  # source -> last seen live
+
+    def should_announce(self, source: str, item_id: str, now: float | None = None) -> bool:
+        """Record a live sighting; True only the first time a new session is seen."""
+        now = now or time.time()
+        last_seen = self.seen.get(source, 0)
+        self.seen[source] = now
+        # Last-seen times are persisted too, so the grace period survives restarts
+        self.store.mark_state_dirty(NOTIFIER_STATE, self.key)
+
+        if item_id in self.ids:
+            return False
+
+        self.ids[item_id] = now
+        self._trim(now)
+        return now - last_seen > self.grace
+
+    def _trim(self, now: float):
+        if len(self.ids) > self.limit:
+            oldest = sorted(self.ids, key=self.ids.get)[: len(self.ids) - self.limit]  # type: ignore
+            for item_id in oldest:
+                del self.ids[item_id]
+        for source, ts in list(self.seen.items()):
+            if now - ts > SEEN_TTL:
+                del self.seen[source]
@@ -0,0 +1,437 @@
+import collections
+import datetime
+import time
+
+import discord
+from discord.ext import commands, tasks
+
+import config
+from checks import admin_or_owner, mod_or_higher
+from config_store import ANTIRAID, SERVER_ROLES
+
+# Defaults, overridable per guild with !antiraid threshold
+JOIN_THRESHOLD = 10         # joins within the window that trip raid mode
+JOIN_WINDOW = 10            # seconds
+SUSPICIOUS_THRESHOLD = 5    # suspicious joins within the window that trip raid mode
+MIN_ACCOUNT_AGE = datetime.timedelta(days=7)
+RAID_COOLDOWN = 600         # seconds without a join burst before raid mode ends
+REVIEW_MAX = 1000           # queued accounts per guild
+RECENT_MAX = 100            # joins remembered to backfill the queue when raid mode trips
+MAX_WINDOW = 300
+DEFAULT_WELCOME = "Welcome to {server}, {user}! Please read the rules."
+
+
+class SlidingCounter:
+    """Events in the last `window` seconds, in one-second buckets (constant memory)."""
+
+    __slots__ = ("window", "counts", "stamps")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.counts = [0] * window
+        self.stamps = [0] * window
+
+    def add(self, now: float, n: int = 1) -> int:
+        second = int(now)
+        i = second % self.window
+        if self.stamps[i] != second:
+            self.stamps[i] = second
+            self.counts[i] = 0
+        self.counts[i] += n
+        return self.total(now)
+
+    def total(self, now: float) -> int:
+        second = int(now)
+        return sum(c for c, s in zip(self.counts, self.stamps) if second - s < self.window)
+
+
+class GuildRaidState:
+    __slots__ = ("joins", "suspicious", "recent", "review", "raid", "raid_since", "last_burst", "restore_level")
+
+    def __init__(self, window: int):
+        self.joins = SlidingCounter(window)
+        self.suspicious = SlidingCounter(window)
+        self.recent: collections.deque[tuple[float, int]] = collections.deque(maxlen=RECENT_MAX)
+        self.review: dict[int, None] = {}  # insertion-ordered set of member IDs
+        self.raid = False
+        self.raid_since = 0.0
+        self.last_burst = 0.0
+        self.restore_level: discord.VerificationLevel | None = None
+
+    def queue(self, member_id: int):
+        self.review[member_id] = None
+        if len(self.review) > REVIEW_MAX:
+            del self.review[next(iter(self.review))]
+
+
+def is_suspicious(member: discord.Member) -> bool:
+    """Cheap heuristics: a brand-new account or one that never set an avatar."""
+    too_new = discord.utils.utcnow() - member.created_at < MIN_ACCOUNT_AGE
+    return too_new or member.avatar is None
+
+
+class AntiRaid(commands.Cog):
+    category = "Moderation"
+    """Detects join bursts and puts the server into raid mode.
+    Outside raid mode it also runs the welcome message and auto-role on join."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.store = bot.config_store
+        self.states: dict[int, GuildRaidState] = {}
+        self.expire_raids.start()
+
+    async def cog_unload(self):
+        self.expire_raids.cancel()
+
+    # -------------------------
+    # Settings / state
+    # -------------------------
+    def settings(self, guild_id: int) -> dict:
+        cfg = self.store.peek(ANTIRAID, guild_id) or {}  # type: ignore
+        return {
+            "enabled": cfg.get("enabled", True),
+            "joins": cfg.get("joins", JOIN_THRESHOLD),
+            "seconds": cfg.get("seconds", JOIN_WINDOW),
+            "suspicious": cfg.get("suspicious", SUSPICIOUS_THRESHOLD),
+            "raise_verification": cfg.get("raise_verification", False),
+        }
+
+    def update_settings(self, guild_id: int, **values):
+        cfg = self.store.guild(ANTIRAID, guild_id)  # type: ignore
+        cfg.update(values)
+        self.store.mark_dirty(ANTIRAID, guild_id)  # type: ignore
+
+    def save_raid(self, guild_id: int, state: GuildRaidState):
+        """Persist an active raid so a restart can resume it and restore the verification level."""
+        level = state.restore_level.value if state.restore_level is not None else None
+        self.update_settings(guild_id, active_raid={"since": state.raid_since, "restore_level": level})
+
+    def clear_raid(self, guild_id: int):
+        cfg = self.store.peek(ANTIRAID, guild_id)  # type: ignore
+        if cfg and cfg.pop("active_raid", None) is not None:
+            self.store.mark_dirty(ANTIRAID, guild_id)  # type: ignore
+
+    def resume_raids(self):
+        """After a restart, pick up raids that were still running; the cooldown then ends them."""
+        now = time.time()
+        for gid, cfg in self.store.section(ANTIRAID).items():
+            saved = cfg.get("active_raid")
+            guild = self.bot.get_guild(int(gid))
+            if not saved or guild is None:
+                continue
+            state = self.state(guild.id)
+            state.raid = True
+            state.raid_since = saved.get("since", now)
+            state.last_burst = now
+            if saved.get("restore_level") is not None:
+                state.restore_level = discord.VerificationLevel(saved["restore_level"])
+
+            embed = discord.Embed(
+                title="🚨 Raid Mode Resumed",
+                description=(
+                    "The bot restarted during raid mode. It ends after "
+                    f"{RAID_COOLDOWN // 60} min without a join burst"
+                    f"{' and restores the verification level' if state.restore_level is not None else ''}."
+                ),
+                color=discord.Color.red(),
+            )
+            self.bot.modlog.log(guild, embed)
+            print(f"[🚨] Raid mode resumed in {guild.id} after restart")
+
+    def state(self, guild_id: int) -> GuildRaidState:
+        window = self.settings(guild_id)["seconds"]
+        state = self.states.get(guild_id)
+        if state is None:
+            state = self.states[guild_id] = GuildRaidState(window)
+        elif state.joins.window != window:
+            # Window changed: start counting afresh, keep raid mode and the queue
+            state.joins = SlidingCounter(window)
+            state.suspicious = SlidingCounter(window)
+        return state
+
+    # -------------------------
+    # Joins
+    # -------------------------
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        guild = member.guild
+        settings = self.settings(guild.id)
+        if not settings["enabled"]:
+            await self.welcome(member)
+            return
+
+        now = time.time()
+        state = self.state(guild.id)
+        suspicious = is_suspicious(member)
+        joins = state.joins.add(now)
+        flagged = state.suspicious.add(now, int(suspicious))
+        state.recent.append((now, member.id))
+
+        if state.raid:
+            state.queue(member.id)
+            if joins >= settings["joins"] or flagged >= settings["suspicious"]:
+                state.last_burst = now
+            return
+
+        if joins >= settings["joins"]:
+            await self.start_raid(guild, state, f"{joins} joins in {settings['seconds']}s")
+            return
+        if flagged >= settings["suspicious"]:
+            await self.start_raid(
+                guild, state, f"{flagged} new/default-avatar accounts in {settings['seconds']}s"
+            )
+            return
+
+        if suspicious:
+            state.queue(member.id)
+        await self.welcome(member)
+
+    async def welcome(self, member: discord.Member):
+        """Auto-role and welcome message, skipped while the guild is in raid mode."""
+        guild = member.guild
+
+        autorole_id = config.server_config.get_id(guild.id, config.AUTO_ROLE_ID_KEY)
+        role = guild.get_role(autorole_id) if autorole_id else None
+        if role:
+            try:
+                await member.add_roles(role, reason="Auto role on join")
+            except discord.HTTPException:
+                pass
+
+        # Channel and message set with !setwelcomechannel / !setwelcomemsg;
+        # older setups only have the channel in the config module
+        settings = self.store.peek(SERVER_ROLES, guild.id) or {}
+        welcome_id = settings.get("welcome_channel") or config.server_config.get_channel_id(
+            guild.id, config.WELCOME_CHANNEL_ID_KEY
+        )
+        channel = guild.get_channel(welcome_id) if welcome_id else None
+        if isinstance(channel, discord.TextChannel):
+            template = settings.get("welcome_message") or DEFAULT_WELCOME
+            text = template.replace("{user}", member.mention).replace("{server}", guild.name)
+            try:
+                await channel.send(text)
+            except discord.HTTPException:
+                pass
+
+    # -------------------------
+    # Raid mode
+    # -------------------------
+    async def start_raid(self, guild: discord.Guild, state: GuildRaidState, reason: str):
+        now = time.time()
+        state.raid = True
+        state.raid_since = now
+        state.last_burst = now
+
+        # Everyone who joined during the burst goes on the review queue
+        window = state.joins.window
+        for joined_at, member_id in state.recent:
+            if now - joined_at <= window:
+                state.queue(member_id)
+
+        raised = ""
+        me = guild.me
+        if (
+            self.settings(guild.id)["raise_verification"]
+            and guild.verification_level < discord.VerificationLevel.high
+            and me.guild_permissions.manage_guild
+        ):
+            try:
+                previous = guild.verification_level
+                await guild.edit(
+                    verification_level=discord.VerificationLevel.high,
+                    reason=f"Raid mode: {reason}",
+                )
+                state.restore_level = previous
+                raised = "\nVerification level raised to **High**."
+            except discord.HTTPException:
+                pass
+        self.save_raid(guild.id, state)
+
+        embed = discord.Embed(
+            title="🚨 Raid Mode Enabled",
+            description=(
+                f"Trigger: {reason}\n"
+                f"Welcomes and auto-role are paused. **{len(state.review)}** accounts queued "
+                f"for review (`!antiraid review`, `!antiraid ban`).{raised}"
+            ),
+            color=discord.Color.red(),
+        )
+        self.bot.modlog.log(guild, embed)
+        print(f"[🚨] Raid mode enabled in {guild.id}: {reason}")
+
+    async def end_raid(self, guild: discord.Guild, state: GuildRaidState, by: str = "cooldown"):
+        state.raid = False
+        restored = ""
+        if state.restore_level is not None:
+            try:
+                await guild.edit(verification_level=state.restore_level, reason="Raid mode ended")
+                restored = f"\nVerification level restored to **{state.restore_level.name.title()}**."
+            except discord.HTTPException:
+                pass
+            state.restore_level = None
+        self.clear_raid(guild.id)
+
+        minutes = int((time.time() - state.raid_since) // 60)
+        embed = discord.Embed(
+            title="✅ Raid Mode Ended",
+            description=(
+                f"Ended by {by} after {minutes} min. "
+                f"**{len(state.review)}** accounts still queued for review.{restored}"
+            ),
+            color=discord.Color.green(),
+        )
+        self.bot.modlog.log(guild, embed)
+
+    @tasks.loop(seconds=30)
+    async def expire_raids(self):
+        now = time.time()
+        for guild_id, state in list(self.states.items()):
+            if state.raid and now - state.last_burst > RAID_COOLDOWN:
+                guild = self.bot.get_guild(guild_id)
+                if guild:
+                    await self.end_raid(guild, state)
+                else:
+                    state.raid = False
+
+    @expire_raids.before_loop
+    async def before_expire_raids(self):
+        await self.bot.wait_until_ready()
+        self.resume_raids()
+
+    # -------------------------
+    # Commands
+    # -------------------------
+    @commands.guild_only()
+    @commands.group(name="antiraid", invoke_without_command=True)
+    @mod_or_higher()
+    async def antiraid(self, ctx: commands.Context):
+        settings = self.settings(ctx.guild.id)  # type: ignore
+        state = self.state(ctx.guild.id)  # type: ignore
+
+        embed = discord.Embed(title="🛡️ Anti-Raid", color=0x5865F2)
+        embed.add_field(name="Detection", value="✅ On" if settings["enabled"] else "❌ Off", inline=True)
+        embed.add_field(name="Raid mode", value="🚨 Active" if state.raid else "✅ Off", inline=True)
+        embed.add_field(name="Review queue", value=str(len(state.review)), inline=True)
+        embed.add_field(
+            name="Thresholds",
+            value=(
+                f"{settings['joins']} joins or {settings['suspicious']} suspicious joins "
+                f"in {settings['seconds']}s"
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Raise verification",
+            value="✅ Yes" if settings["raise_verification"] else "❌ No",
+            inline=True,
+        )
+        embed.set_footer(
+            text="!antiraid on|off • threshold <joins> <seconds> [suspicious] • "
+            "verification on|off • raid on|off • review • ban • clear"
+        )
+        await ctx.send(embed=embed)
+
+    @antiraid.command(name="on")
+    @admin_or_owner()
+    async def antiraid_on(self, ctx: commands.Context):
+        self.update_settings(ctx.guild.id, enabled=True)  # type: ignore
+        await ctx.send("✅ Raid detection enabled.")
+
+    @antiraid.command(name="off")
+    @admin_or_owner()
+    async def antiraid_off(self, ctx: commands.Context):
+        self.update_settings(ctx.guild.id, enabled=False)  # type: ignore
+        await ctx.send("✅ Raid detection disabled.")
+
+    @antiraid.command(name="threshold")
+    @admin_or_owner()
+    async def antiraid_threshold(self, ctx: commands.Context, joins: int, seconds: int, suspicious: int | None = None):
+        if joins < 2 or not 1 <= seconds <= MAX_WINDOW:
+            return await ctx.send(f"❌ Use at least 2 joins and a window of 1–{MAX_WINDOW} seconds.")
+        values = {"joins": joins, "seconds": seconds}
+        if suspicious is not None:
+            values["suspicious"] = max(1, suspicious)
+        self.update_settings(ctx.guild.id, **values)  # type: ignore
+        await ctx.send(f"✅ Raid mode trips at **{joins}** joins in **{seconds}s**.")
+
+    @antiraid.command(name="verification")
+    @admin_or_owner()
+    async def antiraid_verification(self, ctx: commands.Context, mode: str):
+        enabled = mode.lower() in ("on", "yes", "true")
+        self.update_settings(ctx.guild.id, raise_verification=enabled)  # type: ignore
+        await ctx.send(
+            "✅ Raid mode will raise the verification level."
+            if enabled else "✅ Raid mode will leave the verification level alone."
+        )
+
+    @antiraid.command(name="raid")
+    @mod_or_higher()
+    async def antiraid_raid(self, ctx: commands.Context, mode: str):
+        state = self.state(ctx.guild.id)  # type: ignore
+        if mode.lower() in ("on", "yes", "true"):
+            if state.raid:
+                return await ctx.send("⚠️ Raid mode is already active.")
+            await self.start_raid(ctx.guild, state, f"enabled manually by {ctx.author}")  # type: ignore
+            await ctx.send("🚨 Raid mode enabled.")
+        else:
+            if not state.raid:
+                return await ctx.send("⚠️ Raid mode is not active.")
+            await self.end_raid(ctx.guild, state, by=str(ctx.author))  # type: ignore
+            await ctx.send("✅ Raid mode ended.")
+
+    @antiraid.command(name="review")
+    @mod_or_higher()
+    async def antiraid_review(self, ctx: commands.Context):
+        state = self.state(ctx.guild.id)  # type: ignore
+        if not state.review:
+            return await ctx.send("✅ The review queue is empty.")
+
+        lines = []
+        for member_id in list(state.review)[-25:]:
+            member = ctx.guild.get_member(member_id)  # type: ignore
+            if member is None:
+                lines.append(f"`{member_id}` (left)")
+                continue
+            age = (discord.utils.utcnow() - member.created_at).days
+            avatar = "" if member.avatar else " • no avatar"
+            lines.append(f"{member.mention} `{member_id}` • account {age}d old{avatar}")
+
+        embed = discord.Embed(
+            title=f"🔎 Review Queue ({len(state.review)})",
+            description="\n".join(lines),
+            color=discord.Color.orange(),
+        )
+        embed.set_footer(text="Newest 25 shown • !antiraid ban to ban the whole queue")
+        await ctx.send(embed=embed)
+
+    @antiraid.command(name="ban")
+    @mod_or_higher()
+    async def antiraid_ban(self, ctx: commands.Context):
+        state = self.state(ctx.guild.id)  # type: ignore
+        if not state.review:
+            return await ctx.send("✅ The review queue is empty.")
+
+        massban = self.bot.get_command("massban")
+        if massban is None:
+            return await ctx.send("❌ The massban command is not loaded.")
+        ids = " ".join(str(member_id) for member_id in state.review)
+        await ctx.invoke(massban, args=f"{ids} Raid (anti-raid review queue)")  # type: ignore
+
+        # Drop whoever is no longer in the server (banned or left)
+        for member_id in list(state.review):
+            if ctx.guild.get_member(member_id) is None:  # type: ignore
+                del state.review[member_id]
+
+    @antiraid.command(name="clear")
+    @mod_or_higher()
+    async def antiraid_clear(self, ctx: commands.Context):
+        state = self.state(ctx.guild.id)  # type: ignore
+        state.review.clear()
+        await ctx.send("✅ Review queue cleared.")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AntiRaid(bot))
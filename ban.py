@@ -1,8 +1,16 @@
+import asyncio
+import datetime
+import re
+
 import discord
 from discord.ext import commands
-import config
 from checks import mod_or_higher
 
+BULK_BAN_MAX = 200       # users per bulk_ban call (Discord limit)
+MASSBAN_CONFIRM_TIMEOUT = 30
+ID_RE = re.compile(r"^(?:<@!?)?(\d{15,21})>?$")
+JOINED_RE = re.compile(r"^joined:(\d+)$", re.IGNORECASE)
+
 
 class Ban(commands.Cog):
     category = "Moderation"
@@ -67,24 +75,139 @@ class Ban(commands.Cog):
         except discord.HTTPException:
             return await ctx.send("❌ Ban failed due to a Discord error.")
 
-        await ctx.send(f"✅ Banned **{target}**.\nReason: {reason}")
+        case_id = await self.bot.cases.add(ctx.guild.id, "ban", target.id, ctx.author.id, reason)
+        await ctx.send(f"✅ Banned **{target}**. (Case #{case_id})\nReason: {reason}")
 
         # Mod-log
-        modlog_id = config.server_config.get_channel_id(
-            ctx.guild.id, config.MOD_LOG_CHANNEL_ID_KEY
+        embed = discord.Embed(title="Member Banned", color=discord.Color.red())
+        embed.set_footer(text=f"Case #{case_id}")
+        embed.add_field(
+            name="User", value=f"{target} (`{target.id}`)", inline=False
         )
-        if modlog_id:
-            channel = ctx.guild.get_channel(modlog_id)
-            if isinstance(channel, discord.TextChannel):
-                embed = discord.Embed(title="Member Banned", color=discord.Color.red())
-                embed.add_field(
-                    name="User", value=f"{target} (`{target.id}`)", inline=False
-                )
-                embed.add_field(
-                    name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False
+        embed.add_field(
+            name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False
+        )
+        embed.add_field(name="Reason", value=reason, inline=False)
+        self.bot.modlog.log(ctx.guild, embed)
+
+    @commands.guild_only()
+    @commands.command(
+        name="massban",
+        help="Ban many users at once. Usage: !massban <@user|id ...> [joined:<minutes>] [reason]",
+    )
+    @mod_or_higher()
+    async def massban(self, ctx: commands.Context, *, args: str):
+        if ctx.guild is None or not isinstance(ctx.author, discord.Member):
+            return
+        guild = ctx.guild
+
+        # Split IDs/mentions and the optional join-window selector from the reason
+        ids: set[int] = set()
+        joined_minutes = None
+        reason_words = []
+        for word in args.split():
+            if match := ID_RE.match(word):
+                ids.add(int(match.group(1)))
+            elif match := JOINED_RE.match(word):
+                joined_minutes = int(match.group(1))
+            else:
+                reason_words.append(word)
+        reason = " ".join(reason_words) or "Mass ban"
+
+        if joined_minutes is not None:
+            since = discord.utils.utcnow() - datetime.timedelta(minutes=joined_minutes)
+            ids.update(m.id for m in guild.members if m.joined_at and m.joined_at >= since)
+
+        # Never ban ourselves, the bot, the owner or anyone we couldn't ban by hand
+        me = guild.me
+        skipped = 0
+        targets: list[discord.Object] = []
+        for user_id in ids:
+            member = guild.get_member(user_id)
+            if user_id in (ctx.author.id, me.id, guild.owner_id):
+                skipped += 1
+                continue
+            if member is not None and (
+                member.bot
+                or member.top_role >= me.top_role
+                or (member.top_role >= ctx.author.top_role and ctx.author != guild.owner)
+            ):
+                skipped += 1
+                continue
+            targets.append(discord.Object(id=user_id))
+
+        if not targets:
+            return await ctx.send("❌ No bannable users matched.")
+
+        await ctx.send(
+            f"⚠️ About to ban **{len(targets)}** users"
+            f"{f' (skipping {skipped} protected)' if skipped else ''}.\n"
+            f"Type `confirm` within {MASSBAN_CONFIRM_TIMEOUT}s to continue."
+        )
+        try:
+            await self.bot.wait_for(
+                "message",
+                timeout=MASSBAN_CONFIRM_TIMEOUT,
+                check=lambda m: m.author == ctx.author
+                and m.channel == ctx.channel
+                and m.content.lower() == "confirm",
+            )
+        except asyncio.TimeoutError:
+            return await ctx.send("❌ Mass ban cancelled.")
+
+        banned: list[int] = []
+        failed = 0
+        forbidden = False
+        for i in range(0, len(targets), BULK_BAN_MAX):
+            chunk = targets[i:i + BULK_BAN_MAX]
+            try:
+                result = await guild.bulk_ban(
+                    chunk, reason=f"{reason} (mass ban by {ctx.author})", delete_message_seconds=0
                 )
-                embed.add_field(name="Reason", value=reason, inline=False)
-                await channel.send(embed=embed)
+            except discord.Forbidden:
+                # Stop here, but earlier chunks are already banned and still need a record
+                forbidden = True
+                failed += len(targets) - i
+                break
+            except discord.HTTPException:
+                failed += len(chunk)
+                continue
+            banned += [user.id for user in result.banned]
+            failed += len(result.failed)
+
+        if not banned and forbidden:
+            return await ctx.send("❌ I don’t have permission to ban members.")
+
+        # One case per banned user, written in a single transaction
+        case_ids = await self.bot.cases.add_many(guild.id, "ban", banned, ctx.author.id, reason)
+
+        await ctx.send(
+            f"✅ Banned **{len(banned)}** users."
+            f"{f' ❌ Failed: **{failed}**.' if failed else ''}"
+            f"{' Stopped early: I lost permission to ban members.' if forbidden else ''}"
+            f"\nReason: {reason}"
+        )
+
+        # One summary mod-log entry for the whole batch
+        listed = ", ".join(f"`{uid}`" for uid in banned[:50])
+        if len(banned) > 50:
+            listed += f" … and {len(banned) - 50} more"
+        embed = discord.Embed(title="Mass Ban", color=discord.Color.red())
+        embed.add_field(name="Banned", value=f"{len(banned)} users", inline=True)
+        embed.add_field(name="Failed", value=str(failed), inline=True)
+        embed.add_field(
+            name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False
+        )
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if joined_minutes is not None:
+            embed.add_field(
+                name="Selector", value=f"Joined in the last {joined_minutes} minutes", inline=False
+            )
+        if listed:
+            embed.add_field(name="Users", value=listed[:1024], inline=False)
+        if case_ids:
+            embed.set_footer(text=f"Cases #{case_ids[0]}–#{case_ids[-1]}")
+        self.bot.modlog.log(guild, embed)
 
 
 async def setup(bot: commands.Bot):
@@ -1,37 +1,16 @@
 # cogs/admin/blacklist.py
 import discord
 from discord.ext import commands
-from pathlib import Path
-import json
-
-DATA_DIR = Path("data")
-BLACKLIST_FILE = DATA_DIR / "blacklist.json"
-DATA_DIR.mkdir(exist_ok=True)
-if not BLACKLIST_FILE.exists():
-    BLACKLIST_FILE.write_text("{}")  # Empty JSON object
+from blocklist import GLOBAL_KEY
 
 class Blacklist(commands.Cog):
     category = "Owner"
-    """Manage Blacklist / Whitelist users per server."""
+    """Manage Blacklist / Whitelist users per server.
+    Blacklisted users are ignored before any command is parsed (see MyBot.process_commands)."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.blacklist_data = self.load_blacklist()
-
-    # -------------------------
-    # File Handling
-    # -------------------------
-    def load_blacklist(self):
-        try:
-            return json.loads(BLACKLIST_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-
-    def save_blacklist(self):
-        BLACKLIST_FILE.write_text(json.dumps(self.blacklist_data, indent=4))
-
-    def get_guild_blacklist(self, guild_id: int):
-        return self.blacklist_data.setdefault(str(guild_id), {"blacklist": [], "whitelist": []})
+        self.blocklist = bot.blocklist
 
     # -------------------------
     # Blacklist Commands
@@ -39,27 +18,17 @@ class Blacklist(commands.Cog):
     @commands.command(name="blacklist", help="Add a user to the blacklist (Admin only).")
     @commands.has_permissions(administrator=True)
     async def blacklist_user(self, ctx, member: discord.Member):
-        guild_data = self.get_guild_blacklist(ctx.guild.id)
-        if member.id in guild_data["blacklist"]:
+        if not self.blocklist.add(ctx.guild.id, member.id, "blacklist"):
             await ctx.send(f"❌ {member.mention} is already blacklisted.")
             return
-
-        guild_data["blacklist"].append(member.id)
-        if member.id in guild_data["whitelist"]:
-            guild_data["whitelist"].remove(member.id)
-        self.save_blacklist()
         await ctx.send(f"✅ {member.mention} has been **blacklisted**.")
 
     @commands.command(name="unblacklist", help="Remove a user from the blacklist (Admin only).")
     @commands.has_permissions(administrator=True)
     async def unblacklist_user(self, ctx, member: discord.Member):
-        guild_data = self.get_guild_blacklist(ctx.guild.id)
-        if member.id not in guild_data["blacklist"]:
+        if not self.blocklist.remove(ctx.guild.id, member.id, "blacklist"):
             await ctx.send(f"❌ {member.mention} is not blacklisted.")
             return
-
-        guild_data["blacklist"].remove(member.id)
-        self.save_blacklist()
         await ctx.send(f"✅ {member.mention} has been **removed from the blacklist**.")
 
     # -------------------------
@@ -68,41 +37,50 @@ class Blacklist(commands.Cog):
     @commands.command(name="whitelist", help="Add a user to the whitelist (Admin only).")
     @commands.has_permissions(administrator=True)
     async def whitelist_user(self, ctx, member: discord.Member):
-        guild_data = self.get_guild_blacklist(ctx.guild.id)
-        if member.id in guild_data["whitelist"]:
+        if not self.blocklist.add(ctx.guild.id, member.id, "whitelist"):
             await ctx.send(f"❌ {member.mention} is already whitelisted.")
             return
-
-        guild_data["whitelist"].append(member.id)
-        if member.id in guild_data["blacklist"]:
-            guild_data["blacklist"].remove(member.id)
-        self.save_blacklist()
         await ctx.send(f"✅ {member.mention} has been **whitelisted**.")
 
     @commands.command(name="unwhitelist", help="Remove a user from the whitelist (Admin only).")
     @commands.has_permissions(administrator=True)
     async def unwhitelist_user(self, ctx, member: discord.Member):
-        guild_data = self.get_guild_blacklist(ctx.guild.id)
-        if member.id not in guild_data["whitelist"]:
+        if not self.blocklist.remove(ctx.guild.id, member.id, "whitelist"):
             await ctx.send(f"❌ {member.mention} is not whitelisted.")
             return
-
-        guild_data["whitelist"].remove(member.id)
-        self.save_blacklist()
         await ctx.send(f"✅ {member.mention} has been **removed from the whitelist**.")
 
+    # -------------------------
+    # Global Blocklist (bot owner)
+    # -------------------------
+    @commands.command(name="globalblacklist", help="Block a user from the bot in every server (Owner only).")
+    @commands.is_owner()
+    async def global_blacklist(self, ctx, user: discord.User):
+        if not self.blocklist.add(GLOBAL_KEY, user.id, "blacklist"):
+            await ctx.send(f"❌ {user.mention} is already globally blacklisted.")
+            return
+        await ctx.send(f"✅ {user.mention} has been **globally blacklisted**.")
+
+    @commands.command(name="globalunblacklist", help="Lift a global blacklist (Owner only).")
+    @commands.is_owner()
+    async def global_unblacklist(self, ctx, user: discord.User):
+        if not self.blocklist.remove(GLOBAL_KEY, user.id, "blacklist"):
+            await ctx.send(f"❌ {user.mention} is not globally blacklisted.")
+            return
+        await ctx.send(f"✅ {user.mention} has been **removed from the global blacklist**.")
+
     # -------------------------
     # List Blacklist / Whitelist
     # -------------------------
     @commands.command(name="listblacklist", help="Show all blacklisted users in this server.")
     @commands.has_permissions(administrator=True)
     async def list_blacklist(self, ctx):
-        guild_data = self.get_guild_blacklist(ctx.guild.id)
-        if not guild_data["blacklist"]:
+        blacklisted = self.blocklist.list(ctx.guild.id, "blacklist")
+        if not blacklisted:
             await ctx.send("✅ No users are blacklisted.")
             return
 
-        mentions = [f"<@{uid}>" for uid in guild_data["blacklist"]]
+        mentions = [f"<@{uid}>" for uid in blacklisted]
         embed = discord.Embed(
             title="🚫 Blacklisted Users",
             description="\n".join(mentions),
@@ -113,12 +91,12 @@ class Blacklist(commands.Cog):
     @commands.command(name="listwhitelist", help="Show all whitelisted users in this server.")
     @commands.has_permissions(administrator=True)
     async def list_whitelist(self, ctx):
-        guild_data = self.get_guild_blacklist(ctx.guild.id)
-        if not guild_data["whitelist"]:
+        whitelisted = self.blocklist.list(ctx.guild.id, "whitelist")
+        if not whitelisted:
             await ctx.send("✅ No users are whitelisted.")
             return
 
-        mentions = [f"<@{uid}>" for uid in guild_data["whitelist"]]
+        mentions = [f"<@{uid}>" for uid in whitelisted]
         embed = discord.Embed(
             title="✅ Whitelisted Users",
             description="\n".join(mentions),
@@ -0,0 +1,84 @@
+from config_store import BLACKLIST
+
+# Store key for the cross-guild list (guild IDs are never 0)
+GLOBAL_KEY = 0
+
+
+class Blocklist:
+    """
+    Ordered-set view of the blacklist/whitelist store section.
+
+    Each list is held as an insertion-ordered dict, so lookups, adds and
+    removes are all O(1) no matter how many IDs are listed. The persisted
+    lists are rebuilt from those dicts only for changed guilds, right before
+    the store flushes them.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.sets: dict[int, dict[str, dict[int, None]]] = {}  # guild_id -> {kind: ordered ids}
+        self.stale: set[int] = set()  # guilds whose persisted lists lag behind
+        for gid, data in store.section(BLACKLIST).items():
+            self.sets[int(gid)] = {
+                "blacklist": dict.fromkeys(data.get("blacklist", [])),
+                "whitelist": dict.fromkeys(data.get("whitelist", [])),
+            }
+        self.global_ids = self._ids(GLOBAL_KEY, "blacklist")
+        store.before_flush(self.sync)
+
+    def _ids(self, guild_id: int, kind: str) -> dict[int, None]:
+        kinds = self.sets.setdefault(guild_id, {"blacklist": {}, "whitelist": {}})
+        return kinds[kind]
+
+    def is_blocked(self, guild_id: int | None, user_id: int) -> bool:
+        if guild_id is not None:
+            kinds = self.sets.get(guild_id)
+            if kinds:
+                if user_id in kinds["blacklist"]:
+                    return True
+                # A guild's whitelist exempts users from the global list there
+                if user_id in kinds["whitelist"]:
+                    return False
+        return user_id in self.global_ids
+
+    def contains(self, guild_id: int, user_id: int, kind: str) -> bool:
+        return user_id in self._ids(guild_id, kind)
+
+    def add(self, guild_id: int, user_id: int, kind: str) -> bool:
+        ids = self._ids(guild_id, kind)
+        if user_id in ids:
+            return False
+        ids[user_id] = None
+
+        # Blacklist and whitelist are mutually exclusive
+        other = "whitelist" if kind == "blacklist" else "blacklist"
+        self._ids(guild_id, other).pop(user_id, None)
+
+        self._changed(guild_id)
+        return True
+
+    def remove(self, guild_id: int, user_id: int, kind: str) -> bool:
+        ids = self._ids(guild_id, kind)
+        if user_id not in ids:
+            return False
+        del ids[user_id]
+        self._changed(guild_id)
+        return True
+
+    def list(self, guild_id: int, kind: str) -> list[int]:
+        return list(self._ids(guild_id, kind))
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _changed(self, guild_id: int):
+        self.stale.add(guild_id)
+        self.store.mark_dirty(BLACKLIST, guild_id)
+
+    def sync(self):
+        """Copy changed guilds' ordered sets into the store's lists (flush hook)."""
+        for guild_id in self.stale:
+            data = self.store.guild(BLACKLIST, guild_id)
+            for kind, ids in self.sets[guild_id].items():
+                data[kind] = list(ids)
+        self.stale.clear()
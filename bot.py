@@ -2,17 +2,47 @@ import os
 import discord
 from discord.ext import commands
 import config
+from config_store import ConfigStore, GUILD_CONFIG
+from blocklist import Blocklist
+from checks import permission_cache
+from http_client import HTTPClient
+from fanout import FanOut
+from modlog import ModLog
+from case_store import CaseStore
 
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-intents.reactions = True
+# Only needed for emoji reaction roles; button role pickers work without it
+intents.reactions = os.getenv("REACTION_ROLES", "true").lower() != "false"
 intents.guilds = True
 
 
 class MyBot(commands.Bot):
     async def setup_hook(self):
+        # Shared guild config, loaded before any cog reads it
+        self.config_store = ConfigStore()
+        await self.config_store.open()
+        self.blocklist = Blocklist(self.config_store)
+        self.prefixes = {
+            int(gid): cfg["prefix"]
+            for gid, cfg in self.config_store.section(GUILD_CONFIG).items()
+            if cfg.get("prefix")
+        }
+        permission_cache.register(self)
+
+        # Pooled HTTP session shared by the notifier cogs
+        self.http_client = HTTPClient()
+        await self.http_client.open()
+        # Concurrent message delivery to many channels (stream announcements)
+        self.fanout = FanOut(self)
+        # Batched mod-log shared by the moderation cogs
+        self.modlog = ModLog(self)
+        await self.modlog.open()
+        # Numbered moderation cases (data/cases.db)
+        self.cases = CaseStore()
+        await self.cases.open()
 
         # Load cogs
         for root, _, files in os.walk("cogs"):
@@ -29,8 +59,42 @@ class MyBot(commands.Bot):
                     except Exception as e:
                         print(f"[❌] Failed to load {module}: {e}")
 
+    async def process_commands(self, message):
+        # Drop blacklisted users before the prefix or arguments are parsed
+        if message.author.bot:
+            return
+        guild_id = message.guild.id if message.guild else None
+        if self.blocklist.is_blocked(guild_id, message.author.id):
+            return
+        await super().process_commands(message)
+
+    async def close(self):
+        # Post queued mod-log entries while the connection is still up
+        modlog = getattr(self, "modlog", None)
+        if modlog:
+            await modlog.close()
+        await super().close()
+        http_client = getattr(self, "http_client", None)
+        if http_client:
+            await http_client.close()
+        cases = getattr(self, "cases", None)
+        if cases:
+            await cases.close()
+        store = getattr(self, "config_store", None)
+        if store:
+            await store.close()
+
+
+def resolve_prefix(bot, message):
+    """Runs on every message: one dict lookup, no I/O."""
+    prefix = config.PREFIX
+    if message.guild:
+        prefix = bot.prefixes.get(message.guild.id, prefix)
+    user_id = bot.user.id
+    return [f"<@{user_id}> ", f"<@!{user_id}> ", prefix]
+
 
-bot = MyBot(command_prefix=config.PREFIX, intents=intents)
+bot = MyBot(command_prefix=resolve_prefix, intents=intents)
 bot.help_command = None
 
 
@@ -38,7 +102,7 @@ bot.help_command = None
 async def on_ready():
     print(f"✅ Bot is ready: {bot.user}")
     print(f"🌐 Server count: {len(bot.guilds)}")
-    print(f"📌 Prefix: {config.PREFIX}")
+    print(f"📌 Default prefix: {config.PREFIX} ({len(bot.prefixes)} custom)")
 
 
 @bot.event
@@ -7,6 +7,7 @@ import discord
 from discord.ext import commands
 import config
 from datetime import timedelta
+from checks import ADMIN, MOD, NONE, OWNER, PermissionCache
 
 # -------------------------
 # Bot Setup
@@ -23,6 +24,17 @@ bot = commands.Bot(command_prefix=config.PREFIX, intents=intents)
 # -------------------------
 
 
+def named_role_sets(guild):
+    """This bot configures its tiers by role name; resolve them to IDs once per guild."""
+    admin_ids = frozenset(r.id for r in guild.roles if r.name == config.ADMIN_ROLE)
+    mod_ids = frozenset(r.id for r in guild.roles if r.name == config.MODERATOR_ROLE)
+    return admin_ids, mod_ids
+
+
+permission_cache = PermissionCache(named_role_sets)
+permission_cache.register(bot)
+
+
 def is_owner():
     """Only the server owner can use this."""
 
@@ -36,9 +48,9 @@ def is_admin_or_owner():
     """Admin or Owner only."""
 
     async def predicate(ctx):
-        if ctx.author == ctx.guild.owner:
-            return True
-        return any(role.name == config.ADMIN_ROLE for role in ctx.author.roles)
+        if not ctx.guild:
+            return False
+        return permission_cache.tier(ctx.author) >= ADMIN
 
     return commands.check(predicate)
 
@@ -47,11 +59,9 @@ def is_moderator_or_higher():
     """Moderator, Admin, or Owner."""
 
     async def predicate(ctx):
-        if ctx.author == ctx.guild.owner:
-            return True
-        if any(role.name == config.ADMIN_ROLE for role in ctx.author.roles):
-            return True
-        return any(role.name == config.MODERATOR_ROLE for role in ctx.author.roles)
+        if not ctx.guild:
+            return False
+        return permission_cache.tier(ctx.author) >= MOD
 
     return commands.check(predicate)
 
@@ -70,17 +80,16 @@ async def on_command_error(ctx, error):
         await ctx.send("❌ You don't have permission to use this command.")
     elif isinstance(error, commands.CheckFailure):
         cmd = ctx.command.name
-        author = ctx.author
-        guild = ctx.guild
+        tier = permission_cache.tier(ctx.author) if ctx.guild else NONE
 
         # Check who is trying to run it
-        if author == guild.owner:
+        if tier == OWNER:
             await ctx.send(
                 f"❌ This command requires higher privileges. Try again as Admin or Moderator."
             )
-        elif any(role.name == config.ADMIN_ROLE for role in author.roles):
+        elif tier == ADMIN:
             await ctx.send(f"❌ talk to the owner to use `{cmd}`.")
-        elif any(role.name == config.MODERATOR_ROLE for role in author.roles):
+        elif tier == MOD:
             await ctx.send(f"❌ You need the Admin role to use `{cmd}`. command")
         else:
             await ctx.send(f"❌ You need the Moderator role to use `{cmd}`. command")
@@ -3,6 +3,7 @@ from discord.ext import commands
 import psutil
 import platform
 import datetime
+import time
 
 class BotInfo(commands.Cog):
     category = "Admin"
@@ -44,5 +45,29 @@ class BotInfo(commands.Cog):
         embed.set_footer(text=f"Requested by {ctx.author}", icon_url=ctx.author.avatar.url)
         await ctx.send(embed=embed)
 
+    @commands.command(name="apistats", help="Show latency and errors of external API calls.")
+    @commands.has_permissions(administrator=True)
+    async def api_stats(self, ctx):
+        hosts = self.bot.http_client.hosts
+        if not hosts:
+            await ctx.send("✅ No external API calls yet.")
+            return
+
+        embed = discord.Embed(title="🌐 External APIs", color=0x5865F2)
+        for host, stats in sorted(hosts.items()):
+            status = "🟢 OK" if stats.available(time.time()) else "🔴 Paused (circuit open)"
+            embed.add_field(
+                name=host,
+                value=(
+                    f"{status}\n"
+                    f"Requests: {stats.requests} · Retries: {stats.retries}\n"
+                    f"Errors: {stats.errors} · 429s: {stats.rate_limited}\n"
+                    f"Avg latency: {stats.avg_latency * 1000:.0f}ms\n"
+                    f"Last error: {stats.last_error or 'None'}"
+                ),
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(BotInfo(bot))
@@ -0,0 +1,159 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config_store import DATA_DIR
+
+CASES_DB_FILE = DATA_DIR / "cases.db"
+
+CASES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    guild_id     INTEGER NOT NULL,
+    case_id      INTEGER NOT NULL,
+    action       TEXT NOT NULL,
+    target_id    INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    reason       TEXT,
+    created_at   REAL NOT NULL,
+    edited_at    REAL,
+    PRIMARY KEY (guild_id, case_id)
+);
+CREATE INDEX IF NOT EXISTS cases_by_target ON cases (guild_id, target_id, case_id);
+CREATE INDEX IF NOT EXISTS cases_by_moderator ON cases (guild_id, moderator_id, case_id);
+CREATE INDEX IF NOT EXISTS cases_by_time ON cases (guild_id, created_at);
+"""
+
+CASE_COLUMNS = "case_id, action, target_id, moderator_id, reason, created_at, edited_at"
+
+
+class Case:
+    __slots__ = ("case_id", "action", "target_id", "moderator_id", "reason", "created_at", "edited_at")
+
+    def __init__(self, case_id, action, target_id, moderator_id, reason, created_at, edited_at):
+        self.case_id = case_id
+        self.action = action
+        self.target_id = target_id
+        self.moderator_id = moderator_id
+        self.reason = reason
+        self.created_at = created_at
+        self.edited_at = edited_at
+
+
+class CaseStore:
+    """
+    Numbered moderation cases per guild, in their own SQLite file (WAL).
+
+    Case numbers come from the (guild, case) primary key; history lookups by
+    target or moderator use covering indexes, so they stay instant however
+    many cases a guild has. Queries run in a worker thread on one connection.
+    """
+
+    def __init__(self, path: Path = CASES_DB_FILE):
+        self.path = path
+        self.conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def _open(self):
+        self.path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(CASES_SCHEMA)
+
+    def _close(self):
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+    async def open(self):
+        await asyncio.to_thread(self._open)
+
+    async def close(self):
+        await asyncio.to_thread(self._close)
+
+    async def _run(self, fn, *args):
+        def call():
+            with self._lock:
+                return fn(*args)
+        return await asyncio.to_thread(call)
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def _add_many(self, guild_id: int, action: str, target_ids: list[int], moderator_id: int, reason: str | None) -> list[int]:
+        with self.conn:
+            (last,) = self.conn.execute(
+                "SELECT COALESCE(MAX(case_id), 0) FROM cases WHERE guild_id = ?", (guild_id,)
+            ).fetchone()
+            now = time.time()
+            rows = [
+                (guild_id, last + i, action, target_id, moderator_id, reason, now)
+                for i, target_id in enumerate(target_ids, start=1)
+            ]
+            self.conn.executemany(
+                "INSERT INTO cases (guild_id, case_id, action, target_id, moderator_id, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [row[1] for row in rows]
+
+    async def add(self, guild_id: int, action: str, target_id: int, moderator_id: int, reason: str | None) -> int:
+        """Record one action; returns its case number."""
+        (case_id,) = await self._run(self._add_many, guild_id, action, [target_id], moderator_id, reason)
+        return case_id
+
+    async def add_many(self, guild_id: int, action: str, target_ids: list[int], moderator_id: int, reason: str | None) -> list[int]:
+        """Record the same action against many targets in one transaction."""
+        if not target_ids:
+            return []
+        return await self._run(self._add_many, guild_id, action, target_ids, moderator_id, reason)
+
+    def _set_reason(self, guild_id: int, case_id: int, reason: str) -> bool:
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE cases SET reason = ?, edited_at = ? WHERE guild_id = ? AND case_id = ?",
+                (reason, time.time(), guild_id, case_id),
+            )
+        return cur.rowcount > 0
+
+    async def set_reason(self, guild_id: int, case_id: int, reason: str) -> bool:
+        return await self._run(self._set_reason, guild_id, case_id, reason)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def _get(self, guild_id: int, case_id: int) -> Case | None:
+        row = self.conn.execute(
+            f"SELECT {CASE_COLUMNS} FROM cases WHERE guild_id = ? AND case_id = ?",
+            (guild_id, case_id),
+        ).fetchone()
+        return Case(*row) if row else None
+
+    async def get(self, guild_id: int, case_id: int) -> Case | None:
+        return await self._run(self._get, guild_id, case_id)
+
+    def _history(self, guild_id: int, column: str, user_id: int, limit: int, offset: int) -> tuple[int, list[Case]]:
+        (total,) = self.conn.execute(
+            f"SELECT COUNT(*) FROM cases WHERE guild_id = ? AND {column} = ?",
+            (guild_id, user_id),
+        ).fetchone()
+        rows = self.conn.execute(
+            f"SELECT {CASE_COLUMNS} FROM cases WHERE guild_id = ? AND {column} = ? "
+            "ORDER BY case_id DESC LIMIT ? OFFSET ?",
+            (guild_id, user_id, limit, offset),
+        ).fetchall()
+        return total, [Case(*row) for row in rows]
+
+    async def for_target(self, guild_id: int, target_id: int, limit: int = 10, offset: int = 0) -> tuple[int, list[Case]]:
+        """(total, newest-first page) of cases against a user."""
+        return await self._run(self._history, guild_id, "target_id", target_id, limit, offset)
+
+    async def by_moderator(self, guild_id: int, moderator_id: int, limit: int = 10, offset: int = 0) -> tuple[int, list[Case]]:
+        """(total, newest-first page) of cases opened by a moderator."""
+        return await self._run(self._history, guild_id, "moderator_id", moderator_id, limit, offset)
@@ -0,0 +1,102 @@
+import math
+
+import discord
+from discord.ext import commands
+
+from case_store import Case
+from checks import mod_or_higher
+
+CASES_PER_PAGE = 10
+ACTION_ICONS = {"ban": "🔨", "unban": "♻️", "kick": "👢", "clear": "🧹"}
+
+
+def case_line(case: Case) -> str:
+    icon = ACTION_ICONS.get(case.action, "📋")
+    reason = case.reason or "No reason provided"
+    if len(reason) > 80:
+        reason = reason[:77] + "..."
+    return (
+        f"`#{case.case_id}` {icon} **{case.action}** <@{case.target_id}> "
+        f"by <@{case.moderator_id}> • <t:{int(case.created_at)}:R>\n└ {reason}"
+    )
+
+
+class Cases(commands.Cog):
+    category = "Moderation"
+    """Look up and edit moderation cases recorded by ban, kick, unban and clear."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.cases = bot.cases
+
+    async def _send_page(self, ctx: commands.Context, title: str, total: int, cases: list[Case], page: int):
+        if total == 0:
+            return await ctx.send("✅ No cases found.")
+        pages = math.ceil(total / CASES_PER_PAGE)
+        if not cases:
+            return await ctx.send(f"❌ Page {page} doesn't exist (there are {pages}).")
+
+        embed = discord.Embed(
+            title=title,
+            description="\n".join(case_line(c) for c in cases),
+            color=0xED4245,
+        )
+        embed.set_footer(text=f"Page {page}/{pages} • {total} case(s)")
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.command(name="cases", help="Show a user's moderation history. Usage: !cases @user [page]")
+    @mod_or_higher()
+    async def cases_for_user(self, ctx: commands.Context, user: discord.User, page: int = 1):
+        page = max(page, 1)
+        total, cases = await self.cases.for_target(
+            ctx.guild.id, user.id, CASES_PER_PAGE, (page - 1) * CASES_PER_PAGE  # type: ignore
+        )
+        await self._send_page(ctx, f"📁 Cases for {user}", total, cases, page)
+
+    @commands.guild_only()
+    @commands.command(name="casesby", help="Show cases opened by a moderator. Usage: !casesby @mod [page]")
+    @mod_or_higher()
+    async def cases_by_moderator(self, ctx: commands.Context, moderator: discord.User, page: int = 1):
+        page = max(page, 1)
+        total, cases = await self.cases.by_moderator(
+            ctx.guild.id, moderator.id, CASES_PER_PAGE, (page - 1) * CASES_PER_PAGE  # type: ignore
+        )
+        await self._send_page(ctx, f"🛡️ Cases by {moderator}", total, cases, page)
+
+    @commands.guild_only()
+    @commands.command(name="case", help="Show one moderation case. Usage: !case <id>")
+    @mod_or_higher()
+    async def case(self, ctx: commands.Context, case_id: int):
+        case = await self.cases.get(ctx.guild.id, case_id)  # type: ignore
+        if case is None:
+            return await ctx.send(f"❌ Case #{case_id} not found.")
+
+        embed = discord.Embed(
+            title=f"{ACTION_ICONS.get(case.action, '📋')} Case #{case.case_id} • {case.action.title()}",
+            color=0xED4245,
+        )
+        embed.add_field(name="User", value=f"<@{case.target_id}> (`{case.target_id}`)", inline=False)
+        embed.add_field(name="By", value=f"<@{case.moderator_id}> (`{case.moderator_id}`)", inline=False)
+        embed.add_field(name="Reason", value=case.reason or "No reason provided", inline=False)
+        embed.add_field(name="When", value=f"<t:{int(case.created_at)}:F>", inline=True)
+        if case.edited_at:
+            embed.add_field(name="Reason edited", value=f"<t:{int(case.edited_at)}:R>", inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.guild_only()
+    @commands.command(name="reason", help="Change a case's reason. Usage: !reason <id> <new reason>")
+    @mod_or_higher()
+    async def reason(self, ctx: commands.Context, case_id: int, *, reason: str):
+        if not await self.cases.set_reason(ctx.guild.id, case_id, reason):  # type: ignore
+            return await ctx.send(f"❌ Case #{case_id} not found.")
+        await ctx.send(f"✅ Updated the reason of case **#{case_id}**.")
+
+        embed = discord.Embed(title=f"Case #{case_id} Reason Updated", color=discord.Color.blurple())
+        embed.add_field(name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False)
+        embed.add_field(name="New reason", value=reason, inline=False)
+        self.bot.modlog.log(ctx.guild, embed)  # type: ignore
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Cases(bot))
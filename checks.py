@@ -1,23 +1,114 @@
 from discord.ext import commands
 import config
 
+# Permission tiers, highest first
+OWNER = 3
+ADMIN = 2
+MOD = 1
+NONE = 0
 
-def _has_any_role_id(member, role_ids: list[int]) -> bool:
-    member_role_ids = {r.id for r in getattr(member, "roles", [])}
-    return any(rid in member_role_ids for rid in role_ids)
+
+def configured_role_sets(guild) -> tuple[frozenset[int], frozenset[int]]:
+    """Admin/mod role IDs set with the `!setup` role commands."""
+    admin_ids = config.server_config.get_role_ids(guild.id, config.ADMIN_ROLE_IDS_KEY)
+    mod_ids = config.server_config.get_role_ids(guild.id, config.MOD_ROLE_IDS_KEY)
+    return frozenset(admin_ids), frozenset(mod_ids)
+
+
+class PermissionCache:
+    """
+    Per-guild frozensets of the admin/mod role IDs, plus each member's
+    resolved tier, so a check is a couple of dict lookups.
+
+    `resolve_roles(guild)` returns the (admin_ids, mod_ids) pair; it is
+    only called again after the guild's entry is invalidated.
+    """
+
+    def __init__(self, resolve_roles=configured_role_sets):
+        self.resolve_roles = resolve_roles
+        self.role_sets: dict[int, tuple[frozenset[int], frozenset[int]]] = {}
+        self.tiers: dict[int, dict[int, int]] = {}  # guild_id -> {member_id: tier}
+
+    def get_role_sets(self, guild) -> tuple[frozenset[int], frozenset[int]]:
+        sets = self.role_sets.get(guild.id)
+        if sets is None:
+            sets = self.role_sets[guild.id] = self.resolve_roles(guild)
+        return sets
+
+    def tier(self, member) -> int:
+        guild = member.guild
+        guild_tiers = self.tiers.setdefault(guild.id, {})
+        tier = guild_tiers.get(member.id)
+        if tier is None:
+            tier = guild_tiers[member.id] = self._compute(member)
+        return tier
+
+    def _compute(self, member) -> int:
+        if member.id == member.guild.owner_id:
+            return OWNER
+        admin_ids, mod_ids = self.get_role_sets(member.guild)
+        member_role_ids = {r.id for r in getattr(member, "roles", [])}
+        if not admin_ids.isdisjoint(member_role_ids):
+            return ADMIN
+        if not mod_ids.isdisjoint(member_role_ids):
+            return MOD
+        return NONE
+
+    # -------------------------
+    # Invalidation
+    # -------------------------
+    def invalidate_guild(self, guild_id: int):
+        """Call after the guild's admin/mod role config changes."""
+        self.role_sets.pop(guild_id, None)
+        self.tiers.pop(guild_id, None)
+
+    def invalidate_member(self, guild_id: int, member_id: int):
+        self.tiers.get(guild_id, {}).pop(member_id, None)
+
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            self.invalidate_member(after.guild.id, after.id)
+
+    async def on_member_remove(self, member):
+        self.invalidate_member(member.guild.id, member.id)
+
+    async def on_guild_role_create(self, role):
+        self.invalidate_guild(role.guild.id)
+
+    async def on_guild_role_update(self, before, after):
+        self.invalidate_guild(after.guild.id)
+
+    async def on_guild_role_delete(self, role):
+        self.invalidate_guild(role.guild.id)
+
+    async def on_guild_update(self, before, after):
+        if before.owner_id != after.owner_id:
+            self.tiers.pop(after.id, None)
+
+    async def on_guild_remove(self, guild):
+        self.invalidate_guild(guild.id)
+
+    def register(self, bot):
+        for listener in (
+            self.on_member_update,
+            self.on_member_remove,
+            self.on_guild_role_create,
+            self.on_guild_role_update,
+            self.on_guild_role_delete,
+            self.on_guild_update,
+            self.on_guild_remove,
+        ):
+            bot.add_listener(listener)
+
+
+permission_cache = PermissionCache()
 
 
 def admin_or_owner():
     async def predicate(ctx):
         if not ctx.guild:
             return False
-        if ctx.author.id == ctx.guild.owner_id:
-            return True
-
-        admin_ids = config.server_config.get_role_ids(
-            ctx.guild.id, config.ADMIN_ROLE_IDS_KEY
-        )
-        return _has_any_role_id(ctx.author, admin_ids)
+        return permission_cache.tier(ctx.author) >= ADMIN
 
     return commands.check(predicate)
 
@@ -26,18 +117,6 @@ def mod_or_higher():
     async def predicate(ctx):
         if not ctx.guild:
             return False
-        if ctx.author.id == ctx.guild.owner_id:
-            return True
-
-        admin_ids = config.server_config.get_role_ids(
-            ctx.guild.id, config.ADMIN_ROLE_IDS_KEY
-        )
-        mod_ids = config.server_config.get_role_ids(
-            ctx.guild.id, config.MOD_ROLE_IDS_KEY
-        )
-
-        if _has_any_role_id(ctx.author, admin_ids):
-            return True
-        return _has_any_role_id(ctx.author, mod_ids)
+        return permission_cache.tier(ctx.author) >= MOD
 
     return commands.check(predicate)
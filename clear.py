@@ -1,8 +1,20 @@
 import discord
 from discord.ext import commands
 
-import config
 from checks import mod_or_higher
+from purge import PurgeJob, has_link
+
+PURGE_MAX = 5000          # matched messages per command
+PURGE_SCAN_LIMIT = 10000  # history scanned when filtering
+
+
+class PurgeFlags(commands.FlagConverter, delimiter=":", prefix=""):
+    # User, not Member: raid accounts have usually left or been banned by cleanup time
+    user: discord.User | None = None
+    contains: str | None = None
+    links: bool = False
+    files: bool = False
+    bots: bool = False
 
 
 class Clear(commands.Cog):
@@ -11,8 +23,9 @@ class Clear(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.jobs: dict[int, PurgeJob] = {}  # channel_id -> running purge
 
-    async def _log_action(
+    def _log_action(
         self,
         guild: discord.Guild,
         *,
@@ -20,17 +33,8 @@ class Clear(commands.Cog):
         channel: discord.TextChannel,
         action: str,
         details: str,
+        case_id: int | None = None,
     ):
-        modlog_id = config.server_config.get_channel_id(
-            guild.id, config.MOD_LOG_CHANNEL_ID_KEY
-        )
-        if not modlog_id:
-            return
-
-        modlog = guild.get_channel(modlog_id)
-        if not isinstance(modlog, discord.TextChannel):
-            return
-
         embed = discord.Embed(
             title=f"📋 Moderation: {action}",
             description=details,
@@ -40,66 +44,169 @@ class Clear(commands.Cog):
         embed.add_field(
             name="Channel", value=f"{channel.mention} ({channel.id})", inline=False
         )
-        embed.set_footer(text=f"Guild: {guild.name} • ID: {guild.id}")
-
-        try:
-            await modlog.send(embed=embed)
-        except discord.Forbidden:
-            pass
-        except discord.HTTPException:
-            pass
+        footer = f"Guild: {guild.name} • ID: {guild.id}"
+        if case_id:
+            footer += f" • Case #{case_id}"
+        embed.set_footer(text=footer)
+        self.bot.modlog.log(guild, embed)
 
     @commands.guild_only()
     @commands.command(
         name="clear",
-        help="Clear messages. Usage: !clear [amount] OR !clear @user [amount]",
+        help="Clear messages. Usage: !clear [amount] OR !clear @user/ID [amount]",
     )
     @mod_or_higher()
     async def clear(
         self,
         ctx: commands.Context,
-        amount_or_user: int | discord.Member | None = None,
+        # User first: a raw user ID is a valid int too
+        amount_or_user: discord.User | int | None = None,
         amount: int = 10,
     ):
         if ctx.guild is None or not isinstance(ctx.channel, discord.TextChannel):
             return
 
-        user: discord.Member | None = None
+        user: discord.abc.User | None = None
 
         # Allow both:
         #   !clear 10
         #   !clear @user 10
         if isinstance(amount_or_user, int):
             amount = amount_or_user
-        elif isinstance(amount_or_user, discord.Member):
+        elif isinstance(amount_or_user, discord.abc.User):
             user = amount_or_user
 
+        def check(m: discord.Message):
+            return (m.author.id == user.id) if user else True
+
+        # With a user filter, `amount` counts their messages, not scanned lines
+        scan_limit = PURGE_SCAN_LIMIT if user else amount
+        target = f"from {user.mention}" if user else ""
+        await self._run_purge(ctx, amount, scan_limit, check, target, user)
+
+    @commands.guild_only()
+    @commands.command(
+        name="purge",
+        help=(
+            "Delete matching messages. Usage: !purge <amount> "
+            "[user: @user/ID] [contains: text] [links: yes] [files: yes] [bots: yes]"
+        ),
+    )
+    @mod_or_higher()
+    async def purge(self, ctx: commands.Context, amount: int, *, flags: PurgeFlags):
+        if ctx.guild is None or not isinstance(ctx.channel, discord.TextChannel):
+            return
+
+        contains = flags.contains.lower() if flags.contains else None
+
+        def check(m: discord.Message):
+            if flags.user and m.author.id != flags.user.id:
+                return False
+            if flags.bots and not m.author.bot:
+                return False
+            if contains and contains not in m.content.lower():
+                return False
+            if flags.links and not has_link(m):
+                return False
+            if flags.files and not m.attachments:
+                return False
+            return True
+
+        filters = [
+            f"from {flags.user.mention}" if flags.user else "",
+            "from bots" if flags.bots else "",
+            f"containing `{flags.contains}`" if flags.contains else "",
+            "with links" if flags.links else "",
+            "with files" if flags.files else "",
+        ]
+        target = " ".join(f for f in filters if f)
+        scan_limit = PURGE_SCAN_LIMIT if target else amount
+        await self._run_purge(ctx, amount, scan_limit, check, target, flags.user)
+
+    @commands.guild_only()
+    @commands.command(name="cancelpurge", help="Stop a running clear/purge in this channel.")
+    @mod_or_higher()
+    async def cancel_purge(self, ctx: commands.Context):
+        job = self.jobs.get(ctx.channel.id)
+        if job is None:
+            return await ctx.send("❌ No purge is running in this channel.")
+        job.cancel()
+        await ctx.send("🛑 Stopping purge...")
+
+    async def _run_purge(
+        self,
+        ctx: commands.Context,
+        amount: int,
+        scan_limit: int,
+        check,
+        target: str,
+        target_user: discord.abc.User | None = None,
+    ):
         if amount < 1:
             return await ctx.send("❌ You must delete at least 1 message.")
-        if amount > 200:
-            return await ctx.send("❌ Max allowed is 200 messages at a time.")
+        if amount > PURGE_MAX:
+            return await ctx.send(f"❌ Max allowed is {PURGE_MAX} messages at a time.")
+        if ctx.channel.id in self.jobs:
+            return await ctx.send("❌ A purge is already running here. Use `!cancelpurge` to stop it.")
+
+        job = PurgeJob(
+            ctx.channel,  # type: ignore
+            check,
+            amount,
+            max(scan_limit, amount),
+            reason=f"Clear used by {ctx.author}",
+            before=ctx.message,
+        )
+        self.jobs[ctx.channel.id] = job
+        status = await ctx.send("🧹 Purging...")
 
-        def check(m: discord.Message):
-            return (m.author.id == user.id) if user else True
+        async def progress(job: PurgeJob):
+            try:
+                await status.edit(
+                    content=f"🧹 Purging... scanned **{job.scanned}**, deleted **{job.deleted}**/{job.matched}"
+                )
+            except discord.HTTPException:
+                pass
 
         try:
-            deleted = await ctx.channel.purge(
-                limit=amount, check=check, reason=f"Clear used by {ctx.author}"
-            )
+            await ctx.message.delete()
+        except discord.HTTPException:
+            pass
+
+        try:
+            await job.run(progress)
         except discord.Forbidden:
-            return await ctx.send("❌ I don't have permission to delete messages here.")
+            return await status.edit(content="❌ I don't have permission to delete messages here.")
         except discord.HTTPException:
-            return await ctx.send("❌ Failed to delete messages (Discord error).")
+            return await status.edit(content="❌ Failed to delete messages (Discord error).")
+        finally:
+            self.jobs.pop(ctx.channel.id, None)
+
+        stopped = " (cancelled)" if job.cancelled.is_set() else ""
+        failed = f", {job.failed} failed" if job.failed else ""
+        await status.edit(
+            content=f"🧹 Deleted **{job.deleted}** messages{' ' + target if target else ''}{stopped}{failed}.",
+            delete_after=5,
+        )
 
-        target = f"from **{user}**" if user else "messages"
-        await ctx.send(f"🧹 Deleted **{len(deleted)}** {target}.", delete_after=5)
+        # Targeted clears go on the user's record
+        case_id = None
+        if target_user and job.deleted:
+            case_id = await self.bot.cases.add(
+                ctx.guild.id,  # type: ignore
+                "clear",
+                target_user.id,
+                ctx.author.id,
+                f"Deleted {job.deleted} messages in #{ctx.channel}",
+            )
 
-        await self._log_action(
-            ctx.guild,
+        self._log_action(
+            ctx.guild,  # type: ignore
             actor=ctx.author,  # type: ignore (discord.py types)
-            channel=ctx.channel,
+            channel=ctx.channel,  # type: ignore
             action="Clear",
-            details=f"Deleted **{len(deleted)}** messages {('from ' + user.mention) if user else ''}",
+            details=f"Deleted **{job.deleted}** messages{' ' + target if target else ''} (scanned {job.scanned}){stopped}",
+            case_id=case_id,
         )
 
 
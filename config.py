@@ -1,19 +1,16 @@
 import discord
 from discord.ext import commands
-from utils.config_manager import load_config, save_config
+from config_store import GUILD_CONFIG
 
 
 class AdminConfig(commands.Cog):
     category = "Admin"
     def __init__(self, bot):
         self.bot = bot
-        self.config = load_config()
+        self.store = bot.config_store
 
     def get_guild(self, guild_id):
-        gid = str(guild_id)
-        if gid not in self.config:
-            self.config[gid] = {}
-        return self.config[gid]
+        return self.store.guild(GUILD_CONFIG, guild_id)
 
     @commands.command(name="setprefix")
     @commands.has_permissions(administrator=True)
@@ -21,7 +18,8 @@ class AdminConfig(commands.Cog):
         """Change bot prefix per server"""
         guild = self.get_guild(ctx.guild.id)
         guild["prefix"] = prefix
-        save_config(self.config)
+        self.store.mark_dirty(GUILD_CONFIG, ctx.guild.id)
+        self.bot.prefixes[ctx.guild.id] = prefix
         await ctx.send(f"✅ Prefix set to `{prefix}`")
 
     @commands.command(name="config")
@@ -0,0 +1,511 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+DATA_DIR = Path("data")
+DB_FILE = DATA_DIR / "nexus.db"
+
+# -------------------------
+# Sections (one JSON file each)
+# -------------------------
+SERVER_ROLES = "server_roles"
+GUILD_CONFIG = "config"
+BLACKLIST = "blacklist"
+WELCOME = "welcome"
+REACTION_ROLES = "reaction_roles"
+ROLE_PICKERS = "role_pickers"
+ROLE_MENUS = "role_menus"
+TWITCH = "twitch"
+YOUTUBE = "youtube"
+POLL_HISTORY = "poll_history"
+NOTIFIER_STATE = "notifier_state"
+ANTIRAID = "antiraid"
+
+# Sections keyed by bot-wide names ("twitch:app_token") rather than guild IDs
+STATE_SECTIONS = {POLL_HISTORY, NOTIFIER_STATE}
+
+# utils.config_manager (which used to own the prefix/log-channel config) is not
+# part of this tree, so its file name is assumed; override it if yours differs.
+GUILD_CONFIG_FILE = os.getenv("GUILD_CONFIG_FILE", "config.json")
+
+SECTION_FILES = {
+    SERVER_ROLES: "server_roles.json",
+    GUILD_CONFIG: GUILD_CONFIG_FILE,
+    BLACKLIST: "blacklist.json",
+    WELCOME: "welcome_config.json",
+    REACTION_ROLES: "reaction_roles.json",
+    ROLE_PICKERS: "role_pickers.json",
+    ROLE_MENUS: "role_menus.json",
+    TWITCH: "twitch.json",
+    YOUTUBE: "youtube.json",
+    POLL_HISTORY: "poll_history.json",
+    NOTIFIER_STATE: "notifier_state.json",
+    ANTIRAID: "antiraid.json",
+}
+
+FLUSH_DELAY = 2.0  # seconds to batch mutations before writing
+
+# "sqlite" (default) or "json"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+
+
+def _upgrade_reaction_menu(menus: dict) -> dict:
+    """Old files map emoji -> role name with no message; file those under message 0."""
+    legacy = {k: v for k, v in menus.items() if isinstance(v, str)}
+    if not legacy:
+        return menus
+    upgraded = {k: v for k, v in menus.items() if isinstance(v, dict)}
+    upgraded.setdefault("0", {}).update(legacy)
+    return upgraded
+
+
+class JsonBackend:
+    """Stores each section as a JSON file, written atomically (temp file + rename)."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+
+    def open(self):
+        self.data_dir.mkdir(exist_ok=True)
+
+    def close(self):
+        pass
+
+    def path(self, section: str) -> Path:
+        return self.data_dir / SECTION_FILES.get(section, f"{section}.json")
+
+    def load(self, section: str) -> dict:
+        try:
+            data = json.loads(self.path(section).read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if section == REACTION_ROLES:
+            data = {gid: _upgrade_reaction_menu(menus) for gid, menus in data.items()}
+        return data
+
+    def write(self, section: str, snapshot: dict, changes: dict, previous: dict | None = None):
+        path = self.path(section)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id TEXT NOT NULL,
+    section  TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    PRIMARY KEY (guild_id, section, key)
+);
+CREATE TABLE IF NOT EXISTS role_lists (
+    guild_id TEXT NOT NULL,
+    section  TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    role_id  INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, section, kind, role_id)
+);
+CREATE TABLE IF NOT EXISTS reaction_roles (
+    guild_id   TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    emoji      TEXT NOT NULL,
+    role_id    INTEGER,
+    role_name  TEXT,
+    PRIMARY KEY (guild_id, message_id, emoji)
+);
+CREATE TABLE IF NOT EXISTS user_lists (
+    guild_id TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    user_id  INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, kind, user_id)
+);
+"""
+
+USER_LIST_KINDS = ("blacklist", "whitelist")
+
+
+def _is_role_list(key: str, value) -> bool:
+    return key.endswith("_roles") and isinstance(value, list)
+
+
+class SqliteBackend:
+    """
+    Stores sections in SQLite (WAL mode), one table per kind of data.
+
+    Writes only touch the rows of the guilds that changed. All calls come from
+    worker threads and are serialised on one connection.
+    """
+
+    def __init__(self, path: Path = DB_FILE, data_dir: Path = DATA_DIR):
+        self.path = path
+        self.data_dir = data_dir
+        self.conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.data_dir.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate_json()
+
+    def close(self):
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+    def _migrate_json(self):
+        """Import the old data/*.json files once, on the first boot with SQLite."""
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'json_migrated'"
+        ).fetchone()
+        if row:
+            return
+
+        legacy = JsonBackend(self.data_dir)
+        for section in SECTION_FILES:
+            data = legacy.load(section)
+            if data:
+                self.write(section, data, data, {})
+                print(f"[📦] Imported {len(data)} guild(s) from {legacy.path(section)}")
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')"
+            )
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def load(self, section: str) -> dict:
+        with self._lock:
+            if section == BLACKLIST:
+                return self._load_user_lists()
+            if section == REACTION_ROLES:
+                return self._load_reaction_roles()
+            return self._load_settings(section)
+
+    def _load_settings(self, section: str) -> dict:
+        data: dict[str, dict] = {}
+        rows = self.conn.execute(
+            "SELECT guild_id, key, value FROM guild_settings WHERE section = ?",
+            (section,),
+        )
+        for gid, key, value in rows:
+            data.setdefault(gid, {})[key] = json.loads(value)
+
+        rows = self.conn.execute(
+            "SELECT guild_id, kind, role_id FROM role_lists "
+            "WHERE section = ? ORDER BY guild_id, kind, position",
+            (section,),
+        )
+        for gid, kind, role_id in rows:
+            data.setdefault(gid, {}).setdefault(kind, []).append(role_id)
+        return data
+
+    def _load_reaction_roles(self) -> dict:
+        data: dict[str, dict] = {}
+        rows = self.conn.execute(
+            "SELECT guild_id, message_id, emoji, role_id, role_name FROM reaction_roles"
+        )
+        for gid, message_id, emoji, role_id, role_name in rows:
+            menu = data.setdefault(gid, {}).setdefault(str(message_id), {})
+            menu[emoji] = role_id if role_id is not None else role_name
+        return data
+
+    def _load_user_lists(self) -> dict:
+        data: dict[str, dict] = {}
+        rows = self.conn.execute(
+            "SELECT guild_id, kind, user_id FROM user_lists "
+            "ORDER BY guild_id, kind, position"
+        )
+        for gid, kind, user_id in rows:
+            guild = data.setdefault(gid, {k: [] for k in USER_LIST_KINDS})
+            guild.setdefault(kind, []).append(user_id)
+        return data
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def write(self, section: str, snapshot: dict, changes: dict, previous: dict | None = None):
+        """Apply only the rows that differ between each guild's previous and new value."""
+        previous = previous or {}
+        with self._lock, self.conn:
+            for gid, value in changes.items():
+                old = previous.get(gid) or {}
+                if section == BLACKLIST:
+                    self._write_user_lists(gid, value or {}, old)
+                elif section == REACTION_ROLES:
+                    self._write_reaction_roles(gid, value or {}, old)
+                else:
+                    self._write_settings(section, gid, value or {}, old)
+
+    def _sync_lists(self, table: str, item_col: str, scope: dict, old: dict, new: dict):
+        """Delete removed IDs and append added ones; untouched rows are left alone."""
+        where = " AND ".join(f"{col} = ?" for col in scope)
+        scope_vals = tuple(scope.values())
+        for kind in old.keys() | new.keys():
+            old_ids = {int(x) for x in old.get(kind, [])}
+            new_ids = list(dict.fromkeys(int(x) for x in new.get(kind, [])))
+            removed = old_ids.difference(new_ids)
+            added = [x for x in new_ids if x not in old_ids]
+
+            if removed:
+                self.conn.executemany(
+                    f"DELETE FROM {table} WHERE {where} AND kind = ? AND {item_col} = ?",
+                    [(*scope_vals, kind, x) for x in removed],
+                )
+            if added:
+                (top,) = self.conn.execute(
+                    f"SELECT COALESCE(MAX(position), -1) FROM {table} WHERE {where} AND kind = ?",
+                    (*scope_vals, kind),
+                ).fetchone()
+                columns = ", ".join([*scope, "kind", "position", item_col])
+                marks = ", ".join("?" * (len(scope) + 3))
+                self.conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({marks})",
+                    [(*scope_vals, kind, top + 1 + i, x) for i, x in enumerate(added)],
+                )
+
+    def _write_settings(self, section: str, gid: str, value: dict, old: dict):
+        settings = {k: v for k, v in value.items() if not _is_role_list(k, v)}
+        role_lists = {k: v for k, v in value.items() if _is_role_list(k, v)}
+        old_settings = {k: v for k, v in old.items() if not _is_role_list(k, v)}
+        old_role_lists = {k: v for k, v in old.items() if _is_role_list(k, v)}
+
+        self.conn.executemany(
+            "INSERT INTO guild_settings (guild_id, section, key, value) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (guild_id, section, key) DO UPDATE SET value = excluded.value",
+            [
+                (gid, section, k, json.dumps(v))
+                for k, v in settings.items()
+                if k not in old_settings or old_settings[k] != v
+            ],
+        )
+        self.conn.executemany(
+            "DELETE FROM guild_settings WHERE guild_id = ? AND section = ? AND key = ?",
+            [(gid, section, k) for k in old_settings if k not in settings],
+        )
+        self._sync_lists(
+            "role_lists", "role_id", {"guild_id": gid, "section": section},
+            old_role_lists, role_lists,
+        )
+
+    @staticmethod
+    def _reaction_rows(value: dict) -> dict:
+        return {
+            (int(message_id), emoji): (
+                role if isinstance(role, int) else None,
+                role if isinstance(role, str) else None,
+            )
+            for message_id, menu in value.items()
+            for emoji, role in menu.items()
+        }
+
+    def _write_reaction_roles(self, gid: str, value: dict, old: dict):
+        rows, old_rows = self._reaction_rows(value), self._reaction_rows(old)
+        self.conn.executemany(
+            "INSERT INTO reaction_roles (guild_id, message_id, emoji, role_id, role_name) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (guild_id, message_id, emoji) DO UPDATE SET "
+            "role_id = excluded.role_id, role_name = excluded.role_name",
+            [
+                (gid, message_id, emoji, *role)
+                for (message_id, emoji), role in rows.items()
+                if old_rows.get((message_id, emoji)) != role
+            ],
+        )
+        self.conn.executemany(
+            "DELETE FROM reaction_roles WHERE guild_id = ? AND message_id = ? AND emoji = ?",
+            [(gid, *key) for key in old_rows.keys() - rows.keys()],
+        )
+
+    def _write_user_lists(self, gid: str, value: dict, old: dict):
+        self._sync_lists(
+            "user_lists", "user_id", {"guild_id": gid},
+            {k: old.get(k, []) for k in USER_LIST_KINDS},
+            {k: value.get(k, []) for k in USER_LIST_KINDS},
+        )
+
+
+def make_backend():
+    if STORAGE_BACKEND == "json":
+        return JsonBackend()
+    return SqliteBackend()
+
+
+class ConfigStore:
+    """
+    Shared in-memory guild configuration.
+
+    Cogs read and mutate the per-guild dicts directly and call ``mark_dirty``.
+    A background task batches dirty guilds and writes them from a worker thread,
+    so commands never touch the disk on the event loop.
+    """
+
+    def __init__(self, backend=None, flush_delay: float = FLUSH_DELAY):
+        self.backend = backend or make_backend()
+        self.flush_delay = flush_delay
+        self._data: dict[str, dict] = {}
+        self._persisted: dict[str, dict] = {}
+        self._dirty: dict[str, set[str]] = {}
+        self._before_flush: list = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def _load_all(self) -> dict:
+        self.backend.open()
+        return {section: self.backend.load(section) for section in SECTION_FILES}
+
+    async def open(self):
+        loaded = await asyncio.to_thread(self._load_all)
+        for section, data in loaded.items():
+            self._data[section] = data
+            self._persisted[section] = copy.deepcopy(data)
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self.backend.close)
+
+    # -------------------------
+    # Access
+    # -------------------------
+    def section(self, section: str) -> dict:
+        """All guilds of a section, keyed by guild ID string. Treat as read-only."""
+        return self._data.setdefault(section, {})
+
+    def peek(self, section: str, guild_id: int) -> dict | None:
+        """Get a guild's config without creating it."""
+        return self.section(section).get(str(guild_id))
+
+    def guild(self, section: str, guild_id: int) -> dict:
+        """Get or create a guild's config. Call ``mark_dirty`` after mutating it."""
+        return self.section(section).setdefault(str(guild_id), {})
+
+    def mark_dirty(self, section: str, guild_id: int):
+        self._dirty.setdefault(section, set()).add(str(guild_id))
+        self._wakeup.set()
+
+    def replace_guild(self, section: str, guild_id: int, data: dict):
+        """Swap in a guild's whole config in one step."""
+        self.section(section)[str(guild_id)] = data
+        self.mark_dirty(section, guild_id)
+
+    def pop_guild(self, section: str, guild_id: int) -> dict | None:
+        data = self.section(section).pop(str(guild_id), None)
+        if data is not None:
+            self.mark_dirty(section, guild_id)
+        return data
+
+    # -------------------------
+    # Bot-wide state
+    # -------------------------
+    @staticmethod
+    def _check_state(section: str):
+        if section not in STATE_SECTIONS:
+            raise ValueError(f"{section!r} is keyed by guild, not by name")
+
+    def state(self, section: str, key: str) -> dict:
+        """Get or create a named entry of a state section. Call ``mark_state_dirty`` after mutating it."""
+        self._check_state(section)
+        return self.section(section).setdefault(key, {})
+
+    def peek_state(self, section: str, key: str) -> dict | None:
+        self._check_state(section)
+        return self.section(section).get(key)
+
+    def mark_state_dirty(self, section: str, key: str):
+        self._check_state(section)
+        self._dirty.setdefault(section, set()).add(key)
+        self._wakeup.set()
+
+    def replace_state(self, section: str, key: str, data: dict):
+        self._check_state(section)
+        self.section(section)[key] = data
+        self.mark_state_dirty(section, key)
+
+    def before_flush(self, callback):
+        """Run ``callback()`` on the event loop right before dirty guilds are written,
+        for owners that keep a faster in-memory form and only serialize it lazily."""
+        self._before_flush.append(callback)
+
+    # -------------------------
+    # Write-behind
+    # -------------------------
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[❌] Config flush failed: {e}")
+
+    async def flush(self):
+        async with self._lock:
+            for callback in self._before_flush:
+                callback()
+            self._wakeup.clear()
+            dirty, self._dirty = self._dirty, {}
+
+            # A failing section must not stop the others from being written
+            error = None
+            for section, guild_ids in dirty.items():
+                data = self.section(section)
+                persisted = self._persisted.setdefault(section, {})
+                snapshot = dict(persisted)
+                changes, previous = {}, {}
+                for gid in guild_ids:
+                    value = data.get(gid)
+                    previous[gid] = persisted.get(gid)
+                    if value is None:
+                        snapshot.pop(gid, None)
+                    else:
+                        value = copy.deepcopy(value)
+                        snapshot[gid] = value
+                    changes[gid] = value
+
+                try:
+                    await asyncio.to_thread(
+                        self.backend.write, section, snapshot, changes, previous
+                    )
+                    # Only what reached the backend becomes the baseline for the next diff
+                    self._persisted[section] = snapshot
+                except Exception as e:
+                    # Keep the guilds dirty so the next flush retries them
+                    self._dirty.setdefault(section, set()).update(guild_ids)
+                    self._wakeup.set()
+                    error = error or e
+
+            if error:
+                raise error
@@ -0,0 +1,127 @@
+import asyncio
+import datetime
+import hashlib
+import hmac
+import json
+from collections import OrderedDict
+
+from aiohttp import web
+
+# Request headers Twitch sends with every EventSub webhook
+MESSAGE_ID = "Twitch-Eventsub-Message-Id"
+MESSAGE_TIMESTAMP = "Twitch-Eventsub-Message-Timestamp"
+MESSAGE_SIGNATURE = "Twitch-Eventsub-Message-Signature"
+MESSAGE_TYPE = "Twitch-Eventsub-Message-Type"
+
+MAX_MESSAGE_AGE = 600  # seconds; older messages are rejected as replays
+SEEN_LIMIT = 1000      # message IDs remembered for retry deduplication
+
+
+def sign(secret: str, message_id: str, timestamp: str, body: bytes) -> str:
+    """Signature header value for a message, as computed by Twitch."""
+    mac = hmac.new(
+        secret.encode(), message_id.encode() + timestamp.encode() + body, hashlib.sha256
+    )
+    return "sha256=" + mac.hexdigest()
+
+
+def parse_timestamp(value: str) -> datetime.datetime:
+    # Twitch sends RFC3339 with nanoseconds; seconds precision is enough here
+    return datetime.datetime.fromisoformat(value[:19]).replace(tzinfo=datetime.timezone.utc)
+
+
+class EventSubServer:
+    """
+    Small aiohttp server receiving Twitch EventSub webhooks.
+
+    Verifies the HMAC signature and message age, answers the challenge
+    handshake, drops retried deliveries by message ID, and hands each
+    notification to `handler(subscription_type, event)` without blocking the
+    response (Twitch expects a 2xx within a few seconds).
+    """
+
+    def __init__(self, secret: str, handler, host: str = "0.0.0.0", port: int = 8080, path: str = "/eventsub"):
+        self.secret = secret
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.path = path
+        self.seen: OrderedDict[str, None] = OrderedDict()
+        self.tasks: set[asyncio.Task] = set()
+        self.runner: web.AppRunner | None = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post(self.path, self.receive)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        print(f"[✅] EventSub receiver listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def _remember(self, message_id: str) -> bool:
+        """Record a message ID; False if it was already delivered."""
+        if message_id in self.seen:
+            return False
+        self.seen[message_id] = None
+        if len(self.seen) > SEEN_LIMIT:
+            self.seen.popitem(last=False)
+        return True
+
+    async def receive(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        message_id = request.headers.get(MESSAGE_ID)
+        timestamp = request.headers.get(MESSAGE_TIMESTAMP)
+        signature = request.headers.get(MESSAGE_SIGNATURE)
+        message_type = request.headers.get(MESSAGE_TYPE)
+        if not (message_id and timestamp and signature and message_type):
+            return web.Response(status=400)
+
+        if not hmac.compare_digest(sign(self.secret, message_id, timestamp, body), signature):
+            return web.Response(status=403)
+
+        try:
+            sent_at = parse_timestamp(timestamp)
+        except ValueError:
+            return web.Response(status=400)
+        age = (datetime.datetime.now(datetime.timezone.utc) - sent_at).total_seconds()
+        if abs(age) > MAX_MESSAGE_AGE:
+            return web.Response(status=403)
+
+        # Signed but malformed: reject without remembering the ID
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return web.Response(status=400)
+        subscription = payload.get("subscription", {}) if isinstance(payload, dict) else None
+        if not isinstance(subscription, dict):
+            return web.Response(status=400)
+
+        if message_type == "webhook_callback_verification":
+            challenge = payload.get("challenge")
+            if not isinstance(challenge, str):
+                return web.Response(status=400)
+            return web.Response(text=challenge, content_type="text/plain")
+
+        if message_type == "revocation":
+            print(f"[❌] EventSub subscription revoked: {subscription.get('type')} ({subscription.get('status')})")
+            return web.Response(status=204)
+
+        if message_type == "notification":
+            # Only notifications are deduped: a retried challenge must still be answered
+            if not self._remember(message_id):
+                return web.Response(status=204)  # retry of a delivery we already handled
+            task = asyncio.create_task(self._dispatch(subscription.get("type"), payload.get("event", {})))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return web.Response(status=204)
+
+    async def _dispatch(self, sub_type: str, event: dict):
+        try:
+            await self.handler(sub_type, event)
+        except Exception as e:
+            print(f"[❌] EventSub handler failed for {sub_type}: {e}")
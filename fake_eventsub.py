@@ -0,0 +1,224 @@
+"""
+Local stand-in for Twitch's EventSub sender, for testing the webhook receiver.
+
+    python fake_eventsub.py
+    EVENTSUB_SECRET=testsecret123 python fake_eventsub.py http://localhost:8080/eventsub sx2official
+
+Without arguments it runs hermetically: a fake Helix API and OAuth endpoint,
+the real TwitchNotifier with its EventSub receiver, and a throwaway config
+store. With a URL it targets a running bot and can only check status codes.
+
+Sends the challenge handshake and a retry of it (both must be echoed), a
+signed stream.online notification (2xx), a retry of that same message (2xx,
+must be ignored), a bad signature and a stale timestamp (403), and a signed
+malformed body and subscription (400).
+The hermetic run also checks that exactly one announcement went out.
+"""
+import asyncio
+import datetime
+import json
+import os
+import sys
+import tempfile
+import types
+import uuid
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+from eventsub import MESSAGE_ID, MESSAGE_SIGNATURE, MESSAGE_TIMESTAMP, MESSAGE_TYPE, sign
+
+HELIX_PORT = 8092
+RECEIVER_PORT = 8093
+NOTIFY_CHANNEL = 555
+CHALLENGE = "pogchamp-kappa-360noscope"
+
+
+def build(message_type: str, payload, secret: str, message_id: str | None = None, sent_at: datetime.datetime | None = None):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    message_id = message_id or str(uuid.uuid4())
+    sent_at = sent_at or datetime.datetime.now(datetime.timezone.utc)
+    timestamp = sent_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    headers = {
+        MESSAGE_ID: message_id,
+        MESSAGE_TIMESTAMP: timestamp,
+        MESSAGE_SIGNATURE: sign(secret, message_id, timestamp, body),
+        MESSAGE_TYPE: message_type,
+        "Content-Type": "application/json",
+    }
+    return headers, body
+
+
+async def post(session: aiohttp.ClientSession, url: str, headers: dict, body: bytes) -> tuple[int, str]:
+    async with session.post(url, headers=headers, data=body) as r:
+        return r.status, await r.text()
+
+
+async def exchange(url: str, login: str, secret: str):
+    """Send every message kind and assert the receiver's answers."""
+    subscription = {"type": "stream.online", "status": "enabled", "version": "1"}
+
+    async with aiohttp.ClientSession() as session:
+        headers, body = build(
+            "webhook_callback_verification",
+            {"challenge": CHALLENGE, "subscription": subscription},
+            secret,
+        )
+        for attempt in ("challenge", "challenge retry"):
+            status, text = await post(session, url, headers, body)
+            assert status == 200 and text == CHALLENGE, f"{attempt}: {status} {text!r}"
+            print(f"{attempt}:", status)
+
+        event = {
+            "id": str(uuid.uuid4().int)[:11],
+            "broadcaster_user_login": login,
+            "broadcaster_user_name": login,
+            "type": "live",
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        headers, body = build("notification", {"subscription": subscription, "event": event}, secret)
+        for attempt in ("notification", "retry"):
+            status, _ = await post(session, url, headers, body)
+            assert 200 <= status < 300, f"{attempt}: {status}"
+            print(f"{attempt}:", status)
+
+        headers, body = build("notification", {"subscription": subscription, "event": event}, "wrong")
+        status, _ = await post(session, url, headers, body)
+        assert status == 403, f"bad signature: {status}"
+        print("bad signature:", status)
+
+        stale = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+        headers, body = build("notification", {"subscription": subscription, "event": event}, secret, sent_at=stale)
+        status, _ = await post(session, url, headers, body)
+        assert status == 403, f"stale timestamp: {status}"
+        print("stale timestamp:", status)
+
+        headers, body = build("notification", b"{not json", secret)
+        status, _ = await post(session, url, headers, body)
+        assert status == 400, f"malformed body: {status}"
+        print("malformed body:", status)
+
+        headers, body = build("notification", {"subscription": "stream.online", "event": event}, secret)
+        status, _ = await post(session, url, headers, body)
+        assert status == 400, f"malformed subscription: {status}"
+        print("malformed subscription:", status)
+
+
+# -------------------------
+# Hermetic run
+# -------------------------
+class FakeHelix:
+    def __init__(self, login: str):
+        self.login = login
+        self.stream_calls = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/oauth2/token", self.token)
+        app.router.add_get("/helix/streams", self.streams)
+        return app
+
+    async def token(self, request: web.Request) -> web.Response:
+        return web.json_response({"access_token": "fake-token", "expires_in": 5 * 3600})
+
+    async def streams(self, request: web.Request) -> web.Response:
+        self.stream_calls += 1
+        if request.headers.get("Authorization") != "Bearer fake-token":
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        data = [
+            {
+                "id": "40000000001",
+                "user_login": self.login,
+                "user_name": self.login,
+                "game_name": "Just Chatting",
+                "title": "Fake stream",
+                "viewer_count": 7,
+                "started_at": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            for login in request.query.getall("user_login", [])
+            if login == self.login
+        ]
+        return web.json_response({"data": data})
+
+
+class FakeFanOut:
+    """Records announcements instead of posting them."""
+
+    def __init__(self):
+        self.sent: list[tuple[set[int], object]] = []
+
+    async def send(self, channel_ids, on_dead=None, **kwargs):
+        self.sent.append((set(channel_ids), kwargs.get("embed")))
+        return []
+
+    async def run(self, channel_id, action):
+        return None
+
+
+async def never_ready():
+    await asyncio.Event().wait()  # keep the cog's own loops parked
+
+
+async def hermetic(login: str = "fakestreamer"):
+    secret = "testsecret123"
+    os.environ.update({
+        "EVENTSUB_SECRET": secret,
+        "EVENTSUB_HOST": "127.0.0.1",
+        "EVENTSUB_PORT": str(RECEIVER_PORT),
+        "HELIX_BASE": f"http://127.0.0.1:{HELIX_PORT}/helix",
+        "TWITCH_TOKEN_URL": f"http://127.0.0.1:{HELIX_PORT}/oauth2/token",
+        "TWITCH_CLIENT_ID": "fake-client",
+        "TWITCH_CLIENT_SECRET": "fake-secret",
+    })
+    from config_store import TWITCH, ConfigStore, JsonBackend
+    from http_client import HTTPClient
+    from twitch import TwitchNotifier
+
+    helix = FakeHelix(login)
+    runner = web.AppRunner(helix.app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", HELIX_PORT).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConfigStore(JsonBackend(Path(tmp)))
+        await store.open()
+        store.replace_guild(TWITCH, 1, {"channel_id": NOTIFY_CHANNEL, "streamers": [login]})
+        http = HTTPClient()
+        await http.open()
+        bot = types.SimpleNamespace(
+            config_store=store, http_client=http, fanout=FakeFanOut(), wait_until_ready=never_ready
+        )
+        cog = TwitchNotifier(bot)
+        await cog.cog_load()
+        try:
+            await exchange(f"http://127.0.0.1:{RECEIVER_PORT}/eventsub", login, secret)
+
+            # The notification is handled after the 2xx; give it a moment
+            for _ in range(50):
+                if bot.fanout.sent:
+                    break
+                await asyncio.sleep(0.1)
+            await asyncio.sleep(0.3)  # a duplicate would show up by now
+
+            assert len(bot.fanout.sent) == 1, f"{len(bot.fanout.sent)} announcements, expected 1"
+            channels, embed = bot.fanout.sent[0]
+            assert channels == {NOTIFY_CHANNEL}, channels
+            assert embed.url == f"https://twitch.tv/{login}", embed.url
+            assert helix.stream_calls == 1, f"{helix.stream_calls} Helix stream lookups"
+            print(f"announcement: 1 to channel {NOTIFY_CHANNEL} ({embed.url})")
+        finally:
+            await cog.cog_unload()
+            await http.close()
+            await store.close()
+            await runner.cleanup()
+
+    print("✅ all checks passed")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        asyncio.run(exchange(sys.argv[1], sys.argv[2], os.environ["EVENTSUB_SECRET"]))
+        print("✅ all checks passed")
+    else:
+        asyncio.run(hermetic())
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the YouTube Data API, for testing the live-detection pipeline.
+
+    python fake_youtube.py [channels] [live]
+
+Serves playlistItems and videos for `channels` fake channels (default 200),
+`live` of which are streaming (default 30), and runs the notifier's poll
+cycle against it with a throwaway config store. Checks that every live
+channel is announced exactly once, that ended streams are not looked up
+again, and that the quota budget charged exactly the calls the server got,
+including after a restart.
+"""
+import asyncio
+import collections
+import math
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+from aiohttp import web
+
+PORT = int(os.getenv("FAKE_YOUTUBE_PORT", "8091"))
+UPLOADS_PER_CHANNEL = 5
+
+os.environ["YOUTUBE_API_BASE"] = f"http://127.0.0.1:{PORT}/youtube/v3"
+os.environ.setdefault("YOUTUBE_API_KEY", "test")
+
+from config_store import NOTIFIER_STATE, YOUTUBE, ConfigStore, JsonBackend  # noqa: E402
+from http_client import HTTPClient  # noqa: E402
+from youtube import CHANNEL_ID, MAX_CHANNELS_PER_GUILD, QUOTA_KEY, RECENT_UPLOADS, VIDEOS_BATCH, QuotaBudget, YouTubeNotifier  # noqa: E402
+
+
+# -------------------------
+# Mock API
+# -------------------------
+class FakeYouTube:
+    def __init__(self, channels: int, live: int):
+        self.channels = [f"UC{i:022d}" for i in range(channels)]
+        self.live = set(self.channels[:live])
+        self.videos: dict[str, dict] = {}
+        self.uploads: dict[str, list[str]] = {}
+        self.calls = collections.Counter()
+
+        for channel in self.channels:
+            ids = [f"{channel[2:]}-{j}" for j in range(UPLOADS_PER_CHANNEL)]
+            self.uploads["UU" + channel[2:]] = ids
+            for j, video_id in enumerate(ids):
+                video = {
+                    "id": video_id,
+                    "snippet": {
+                        "title": f"Video {j} of {channel}",
+                        "channelId": channel,
+                        "channelTitle": f"Channel {channel}",
+                        "thumbnails": {"high": {"url": "https://i.ytimg.com/vi/x/hqdefault.jpg"}},
+                    },
+                }
+                if j == 0 and channel in self.live:
+                    video["liveStreamingDetails"] = {
+                        "actualStartTime": "2026-01-01T12:00:00Z",
+                        "concurrentViewers": "42",
+                    }
+                elif j == 1:
+                    video["liveStreamingDetails"] = {
+                        "actualStartTime": "2026-01-01T10:00:00Z",
+                        "actualEndTime": "2026-01-01T11:00:00Z",
+                    }
+                self.videos[video_id] = video
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/youtube/v3/playlistItems", self.playlist_items)
+        app.router.add_get("/youtube/v3/videos", self.videos_list)
+        return app
+
+    async def playlist_items(self, request: web.Request) -> web.Response:
+        self.calls["playlistItems"] += 1
+        assert request.query.get("key"), "missing API key"
+        ids = self.uploads.get(request.query["playlistId"])
+        if ids is None:
+            return web.json_response({"error": {"code": 404}}, status=404)
+        limit = int(request.query.get("maxResults", 5))
+        items = [{"contentDetails": {"videoId": v}} for v in ids[:limit]]
+        return web.json_response({"items": items})
+
+    async def videos_list(self, request: web.Request) -> web.Response:
+        self.calls["videos"] += 1
+        ids = request.query["id"].split(",")
+        assert len(ids) <= 50, f"videos.list called with {len(ids)} IDs"
+        return web.json_response({"items": [self.videos[v] for v in ids if v in self.videos]})
+
+
+# -------------------------
+# Harness
+# -------------------------
+class FakeFanOut:
+    """Records announcements instead of posting them."""
+
+    def __init__(self):
+        self.sent: list[tuple[set[int], object]] = []
+
+    async def send(self, channel_ids, on_dead=None, **kwargs):
+        self.sent.append((set(channel_ids), kwargs.get("embed")))
+        return []
+
+    async def run(self, channel_id, action):
+        return None
+
+
+async def never_ready():
+    await asyncio.Event().wait()  # keep the cog's own loops parked
+
+
+def poke_all(cog: YouTubeNotifier):
+    for key in cog.scheduler.sources:
+        cog.scheduler.poke(key)
+
+
+async def main(channels: int, live: int):
+    api = FakeYouTube(channels, live)
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConfigStore(JsonBackend(Path(tmp)))
+        await store.open()
+        http = HTTPClient()
+        await http.open()
+
+        # Spread the watch list over as many guilds as the per-guild cap needs
+        for n, i in enumerate(range(0, channels, MAX_CHANNELS_PER_GUILD)):
+            store.replace_guild(YOUTUBE, n + 1, {
+                "channel_id": 1000 + n,
+                "channels": api.channels[i:i + MAX_CHANNELS_PER_GUILD],
+            })
+
+        bot = types.SimpleNamespace(
+            config_store=store, http_client=http, fanout=FakeFanOut(), wait_until_ready=never_ready
+        )
+        cog = YouTubeNotifier(bot)
+        try:
+            # Cycle 1: every channel is new, so all are due
+            await cog.check_live()
+            polled = channels + (1 if CHANNEL_ID else 0)
+            candidates = channels * RECENT_UPLOADS
+            assert api.calls["playlistItems"] == polled, api.calls
+            assert api.calls["videos"] == math.ceil(candidates / VIDEOS_BATCH), api.calls
+            announced = {embed.author.url.rsplit("/", 1)[1] for _, embed in bot.fanout.sent}
+            assert announced == api.live, f"announced {len(announced)} of {len(api.live)} live channels"
+            assert cog.quota.spent == sum(api.calls.values()), (cog.quota.spent, api.calls)
+            print(f"cycle 1: {dict(api.calls)} -> {len(announced)} announcements, {cog.quota.spent} units")
+
+            # Cycle 2: same streams still live; settled videos are skipped, nothing re-announced
+            before = sum(api.calls.values())
+            poke_all(cog)
+            await cog.check_live()
+            lookups = api.calls["videos"] - math.ceil(candidates / VIDEOS_BATCH)
+            assert len(bot.fanout.sent) == len(api.live), "a live stream was announced twice"
+            assert lookups == math.ceil(live / VIDEOS_BATCH), f"{lookups} videos.list calls, expected only live IDs"
+            assert cog.quota.spent == sum(api.calls.values())
+            print(f"cycle 2: {sum(api.calls.values()) - before} units, no new announcements")
+
+            # Restart: a fresh budget must carry on from the persisted tally
+            await store.flush()
+            restarted = ConfigStore(JsonBackend(Path(tmp)))
+            await restarted.open()
+            saved = restarted.peek_state(NOTIFIER_STATE, QUOTA_KEY)
+            assert saved and saved["spent"] == cog.quota.spent, saved
+            assert QuotaBudget(cog.quota.daily_units, restarted).spent == cog.quota.spent
+            await restarted.close()
+            print(f"restart: quota tally {saved['spent']} units restored")
+        finally:
+            await cog.cog_unload()
+            await http.close()
+            await store.close()
+            await runner.cleanup()
+
+    print("✅ all checks passed")
+
+
+if __name__ == "__main__":
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    live = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    asyncio.run(main(channels, live))
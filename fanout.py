@@ -0,0 +1,80 @@
+import asyncio
+
+import discord
+
+FANOUT_CONCURRENCY = 20   # channel sends/edits in flight at once, bot-wide
+MAX_DEAD_FAILURES = 3     # consecutive 403/404s before a channel is dropped
+
+
+class FanOut:
+    """
+    Concurrent delivery of one message to many channels.
+
+    Sends run in parallel under a bot-wide semaphore, while work for the same
+    channel stays in call order (per-channel FIFO lock), so a slow or
+    forbidden channel only delays itself. Channels that keep answering
+    403/404 are reported through `on_dead` so the caller can unsubscribe
+    them. A channel missing from the cache (outage, cache not ready yet) is
+    skipped for that delivery but never counted as dead.
+    """
+
+    def __init__(self, bot, concurrency: int = FANOUT_CONCURRENCY, max_failures: int = MAX_DEAD_FAILURES):
+        self.bot = bot
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_failures = max_failures
+        self.locks: dict[int, asyncio.Lock] = {}
+        self.waiting: dict[int, int] = {}  # channel_id -> runs holding or queued on its lock
+        self.failures: dict[int, int] = {}
+
+    async def run(self, channel_id: int, action, on_dead=None):
+        """Run `action(channel)` for one channel; returns its result or None on failure."""
+        lock = self.locks.setdefault(channel_id, asyncio.Lock())
+        self.waiting[channel_id] = self.waiting.get(channel_id, 0) + 1
+        try:
+            async with lock, self.semaphore:
+                return await self._run(channel_id, action, on_dead)
+        finally:
+            # Locks only live while a channel has work queued
+            left = self.waiting.pop(channel_id) - 1
+            if left:
+                self.waiting[channel_id] = left
+            else:
+                self.locks.pop(channel_id, None)
+
+    async def _run(self, channel_id: int, action, on_dead):
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            print(f"[⚠️] Channel {channel_id} is not in the cache; skipped this delivery")
+            return None
+        try:
+            result = await action(channel)
+        except (discord.Forbidden, discord.NotFound) as e:
+            await self._failed(channel_id, e, on_dead)
+            return None
+        except discord.HTTPException as e:
+            print(f"[❌] Delivery to channel {channel_id} failed: {e}")
+            return None
+
+        self.failures.pop(channel_id, None)
+        return result
+
+    async def _failed(self, channel_id: int, error: Exception, on_dead):
+        count = self.failures.get(channel_id, 0) + 1
+        self.failures[channel_id] = count
+        print(f"[❌] Delivery to channel {channel_id} failed ({count}/{self.max_failures}): {error}")
+        if count >= self.max_failures and on_dead:
+            self.failures.pop(channel_id, None)
+            try:
+                on_dead(channel_id)
+            except Exception as e:
+                print(f"[❌] Failed to drop channel {channel_id}: {e}")
+
+    async def send(self, channel_ids, on_dead=None, **kwargs) -> list[discord.Message]:
+        """Send the same message to every channel concurrently; returns the ones delivered."""
+        async def send_one(channel):
+            return await channel.send(**kwargs)
+
+        results = await asyncio.gather(
+            *(self.run(channel_id, send_one, on_dead) for channel_id in channel_ids)
+        )
+        return [message for message in results if message is not None]
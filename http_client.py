@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+USER_AGENT = "SX2-Nexus (discord bot)"
+
+MAX_RETRIES = 3          # extra attempts after the first one
+BACKOFF_BASE = 1.0       # seconds, doubled per attempt
+BACKOFF_CAP = 30.0
+MAX_RATE_LIMIT_WAIT = 60.0  # longer waits are left to the caller's next poll
+
+BREAKER_THRESHOLD = 5    # consecutive failures that open a host's breaker
+BREAKER_COOLDOWN = 60.0  # seconds, doubled while the host keeps failing
+BREAKER_MAX_COOLDOWN = 900.0
+
+
+class HTTPResult:
+    """Fully read response. status 0 means no response (network error or open breaker)."""
+
+    __slots__ = ("status", "headers", "data", "attempts")
+
+    def __init__(self, status: int, headers=None, data=None, attempts: int = 0):
+        self.status = status
+        self.headers = headers or {}
+        self.data = data
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class HostStats:
+    """Per-host latency/error counters plus the circuit breaker state."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.total_latency = 0.0
+        self.last_error: str | None = None
+        self.failures = 0         # consecutive
+        self.open_until = 0.0
+        self.cooldown = BREAKER_COOLDOWN
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def available(self, now: float) -> bool:
+        return now >= self.open_until
+
+    def success(self):
+        self.failures = 0
+        self.cooldown = BREAKER_COOLDOWN
+
+    def failure(self, reason: str, now: float):
+        self.errors += 1
+        self.last_error = reason
+        self.failures += 1
+        if self.failures >= BREAKER_THRESHOLD:
+            # Open (or re-open after a failed trial request) and back off further
+            self.open_until = now + self.cooldown
+            self.cooldown = min(BREAKER_MAX_COOLDOWN, self.cooldown * 2)
+
+
+def retry_delay(headers, now: float) -> float | None:
+    """Seconds to wait from Retry-After (seconds or HTTP date) or Ratelimit-Reset (epoch)."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = headers.get("Ratelimit-Reset")
+    if reset:
+        try:
+            return max(0.0, float(reset) - now)
+        except ValueError:
+            pass
+    return None
+
+
+def backoff(attempt: int) -> float:
+    # Full jitter so many pollers don't retry in lockstep
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class HTTPClient:
+    """
+    One pooled aiohttp session for every cog that calls external APIs.
+
+    Opened in setup_hook and closed when the bot shuts down, so polls reuse
+    warm keep-alive connections instead of a new TCP+TLS handshake each time.
+
+    `request` never raises for HTTP or network trouble: it retries 429/5xx
+    and connection errors with jittered backoff, honours rate-limit headers,
+    and keeps a circuit breaker per host so pollers pause during outages.
+    """
+
+    def __init__(self):
+        self.session: aiohttp.ClientSession | None = None
+        self.hosts: dict[str, HostStats] = {}
+
+    async def open(self):
+        connector = aiohttp.TCPConnector(
+            limit=100,            # total sockets
+            limit_per_host=10,    # per API host
+            ttl_dns_cache=300,    # seconds
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=15, connect=5),
+            headers={"User-Agent": USER_AGENT},
+        )
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    # -------------------------
+    # Requests
+    # -------------------------
+    def stats(self, host: str) -> HostStats:
+        return self.hosts.setdefault(host, HostStats())
+
+    def available(self, url_or_host: str) -> bool:
+        """False while the host's circuit breaker is open."""
+        host = urlsplit(url_or_host).hostname or url_or_host
+        return self.stats(host).available(time.time())
+
+    async def request(self, method: str, url: str, retries: int = MAX_RETRIES, **kwargs) -> HTTPResult:
+        host = urlsplit(url).hostname or url
+        stats = self.stats(host)
+        result = HTTPResult(0)
+
+        for attempt in range(retries + 1):
+            now = time.time()
+            if not stats.available(now):
+                return result
+
+            if attempt:
+                stats.retries += 1
+            stats.requests += 1
+            result.attempts += 1
+            start = time.monotonic()
+            try:
+                async with self.session.request(method, url, **kwargs) as r:  # type: ignore
+                    if r.content_type == "application/json":
+                        data = await r.json()
+                    else:
+                        data = await r.text()
+                    result = HTTPResult(r.status, r.headers, data, result.attempts)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                stats.total_latency += time.monotonic() - start
+                stats.failure(type(e).__name__, time.time())
+                if attempt < retries:
+                    await asyncio.sleep(backoff(attempt))
+                continue
+            except ValueError as e:  # malformed JSON body
+                stats.total_latency += time.monotonic() - start
+                stats.failure(f"bad body: {e}", time.time())
+                return HTTPResult(0, attempts=result.attempts)
+            stats.total_latency += time.monotonic() - start
+
+            if result.status == 429:
+                stats.rate_limited += 1
+                stats.last_error = "HTTP 429"
+                wait = retry_delay(result.headers, time.time())
+                if wait is None:
+                    wait = backoff(attempt)
+                if wait > MAX_RATE_LIMIT_WAIT or attempt == retries:
+                    return result
+                await asyncio.sleep(wait)
+                continue
+
+            if result.status >= 500:
+                stats.failure(f"HTTP {result.status}", time.time())
+                if attempt < retries:
+                    await asyncio.sleep(backoff(attempt))
+                continue
+
+            # Any other answer (including 4xx) means the host is up
+            stats.success()
+            if not result.ok:
+                stats.errors += 1
+                stats.last_error = f"HTTP {result.status}"
+            return result
+
+        return result
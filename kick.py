@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import config
 from checks import mod_or_higher
 
 
@@ -64,7 +63,20 @@ class Kick(commands.Cog):
             return await ctx.send("❌ I don’t have permission to kick members.")
         except discord.HTTPException:
             return await ctx.send("❌ Kick failed due to a Discord error.")
-        await ctx.send(f"✅ Kicked **{member}**.\nReason: {reason}")
+        case_id = await self.bot.cases.add(ctx.guild.id, "kick", member.id, ctx.author.id, reason)
+        await ctx.send(f"✅ Kicked **{member}**. (Case #{case_id})\nReason: {reason}")
+
+        # Mod-log
+        embed = discord.Embed(title="Member Kicked", color=discord.Color.orange())
+        embed.set_footer(text=f"Case #{case_id}")
+        embed.add_field(
+            name="User", value=f"{member} (`{member.id}`)", inline=False
+        )
+        embed.add_field(
+            name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False
+        )
+        embed.add_field(name="Reason", value=reason, inline=False)
+        self.bot.modlog.log(ctx.guild, embed)
 
 
 async def setup(bot: commands.Bot):
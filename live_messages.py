@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import discord
+
+from config_store import NOTIFIER_STATE
+
+EDIT_INTERVAL = 60  # min seconds between edits of one notification
+UNKNOWN_MESSAGE = 10008  # Discord error code for a deleted message
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds) // 60
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+
+class LiveMessages:
+    """
+    Keeps the go-live notification of each source up to date by editing it
+    in place instead of posting follow-ups.
+
+    One session per source (Twitch login / YouTube channel), persisted so
+    edits resume after a restart. Updates are coalesced: only the newest
+    embed is kept, and it is sent at most once per `min_interval`.
+    """
+
+    def __init__(self, bot, store, prefix: str, min_interval: float = EDIT_INTERVAL):
+        self.bot = bot
+        self.store = store
+        self.key = f"{prefix}:messages"
+        self.min_interval = min_interval
+        # source -> {"started_at", "embed", "messages": [[channel_id, message_id], ...]}
+        self.sessions: dict[str, dict] = store.state(NOTIFIER_STATE, self.key)
+        self.pending: dict[str, dict] = {}  # source -> newest embed not yet sent
+        self.ending: set[str] = set()
+        self.last_edit: dict[str, float] = {}
+
+    def _save(self):
+        self.store.mark_state_dirty(NOTIFIER_STATE, self.key)
+
+    # -------------------------
+    # Sessions
+    # -------------------------
+    def active(self, source: str) -> bool:
+        return source in self.sessions and source not in self.ending
+
+    def start(self, source: str, started_at: float, embed: discord.Embed, messages: list[discord.Message]):
+        self.sessions[source] = {
+            "started_at": started_at,
+            "embed": embed.to_dict(),
+            "messages": [[m.channel.id, m.id] for m in messages],
+        }
+        self.pending.pop(source, None)
+        self.ending.discard(source)
+        self.last_edit[source] = time.time()
+        self._save()
+
+    def update(self, source: str, embed: discord.Embed):
+        """Queue the newest state; replaces any edit still waiting for its slot."""
+        session = self.sessions.get(source)
+        if session is None or source in self.ending:
+            return
+        data = embed.to_dict()
+        if data == session["embed"]:
+            self.pending.pop(source, None)
+        else:
+            self.pending[source] = data
+
+    def end(self, source: str):
+        """Queue the final "ended" edit; the session is dropped once it is sent."""
+        session = self.sessions.get(source)
+        if session is None or source in self.ending:
+            return
+        data = self.pending.pop(source, session["embed"])
+        embed = discord.Embed.from_dict(data)
+        embed.title = "⚫ STREAM ENDED"
+        embed.color = discord.Color.dark_grey()
+        embed.add_field(
+            name="⏱️ Duration",
+            value=format_duration(time.time() - session["started_at"]),
+            inline=True,
+        )
+        self.pending[source] = embed.to_dict()
+        self.ending.add(source)
+
+    # -------------------------
+    # Edits
+    # -------------------------
+    async def flush(self):
+        """Send queued edits whose per-message throttle has elapsed."""
+        now = time.time()
+        for source in list(self.pending):
+            if now - self.last_edit.get(source, 0) < self.min_interval:
+                continue
+            session = self.sessions.get(source)
+            data = self.pending.pop(source)
+            if session is None:
+                continue
+            self.last_edit[source] = now
+
+            embed = discord.Embed.from_dict(data)
+
+            async def edit(channel, message_id):
+                try:
+                    await channel.get_partial_message(message_id).edit(embed=embed)
+                except discord.NotFound as e:
+                    if e.code != UNKNOWN_MESSAGE:
+                        raise
+                    return False  # message deleted; stop editing it
+                return True
+
+            messages = session["messages"]
+            results = await asyncio.gather(*(
+                self.bot.fanout.run(channel_id, lambda ch, mid=message_id: edit(ch, mid))
+                for channel_id, message_id in messages
+            ))
+            kept = [m for m, result in zip(messages, results) if result is not False]
+
+            if source in self.ending:
+                self.ending.discard(source)
+                self.last_edit.pop(source, None)
+                del self.sessions[source]
+            else:
+                session["embed"] = data
+                session["messages"] = kept
+            self._save()
@@ -1,26 +1,23 @@
 import discord
 from discord.ext import commands
-from utils.config_manager import load_config, save_config
+from config_store import GUILD_CONFIG
 
 class AdminLogs(commands.Cog):
     category = "Admin"
     def __init__(self, bot):
         self.bot = bot
-        self.config = load_config()
+        self.store = bot.config_store
 
     def get_guild(self, guild_id):
         """Get or create guild config"""
-        gid = str(guild_id)
-        if gid not in self.config:
-            self.config[gid] = {}
-        return self.config[gid]
+        return self.store.guild(GUILD_CONFIG, guild_id)
 
     @commands.command(name="setlogchannel", help="Set the moderation log channel for the server.")
     @commands.has_permissions(administrator=True)
     async def set_log_channel(self, ctx, channel: discord.TextChannel):
         guild_cfg = self.get_guild(ctx.guild.id)
         guild_cfg["log_channel"] = channel.id
-        save_config(self.config)
+        self.store.mark_dirty(GUILD_CONFIG, ctx.guild.id)
         await ctx.send(f"✅ Moderation log channel set to {channel.mention}")
 
     @commands.command(name="logchannel", help="Show the currently set moderation log channel.")
@@ -0,0 +1,165 @@
+import asyncio
+
+import discord
+
+import config
+
+EMBEDS_PER_MESSAGE = 10  # Discord's limit per message
+EMBED_CHARS_PER_MESSAGE = 6000  # Discord's limit on all embeds of a message combined
+FLUSH_DELAY = 2.0        # seconds to gather entries before posting
+WEBHOOK_NAME = "SX2 Nexus Mod Log"
+
+
+def pack(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+    """Split embeds into messages within both the count and the character limit."""
+    batches: list[list[discord.Embed]] = []
+    batch: list[discord.Embed] = []
+    size = 0
+    for embed in embeds:
+        length = len(embed)
+        if batch and (len(batch) == EMBEDS_PER_MESSAGE or size + length > EMBED_CHARS_PER_MESSAGE):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(embed)
+        size += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class ModLog:
+    """
+    Shared mod-log writer for every moderation command.
+
+    Entries are queued per guild and posted up to 10 embeds (and 6000
+    embed characters) per message, either after a short delay or as soon as
+    10 are waiting. The mod-log
+    channel is resolved once per guild and cached; when the bot may manage
+    webhooks there it posts through its own webhook, which has its own rate
+    limit, and falls back to a plain channel send otherwise.
+    """
+
+    def __init__(self, bot, flush_delay: float = FLUSH_DELAY):
+        self.bot = bot
+        self.flush_delay = flush_delay
+        self.queues: dict[int, list[discord.Embed]] = {}
+        self.channels: dict[int, int | None] = {}       # guild_id -> mod-log channel ID
+        self.webhooks: dict[int, discord.Webhook | None] = {}
+        self.locks: dict[int, asyncio.Lock] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()  # early flushes of full queues
+
+    async def open(self):
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    # -------------------------
+    # Channel cache
+    # -------------------------
+    def invalidate(self, guild_id: int):
+        """Forget the cached channel/webhook, e.g. after `!setup setmodlog`."""
+        self.channels.pop(guild_id, None)
+        self.webhooks.pop(guild_id, None)
+
+    def channel_for(self, guild: discord.Guild) -> discord.TextChannel | None:
+        if guild.id not in self.channels:
+            self.channels[guild.id] = config.server_config.get_channel_id(
+                guild.id, config.MOD_LOG_CHANNEL_ID_KEY
+            )
+        channel_id = self.channels[guild.id]
+        channel = guild.get_channel(channel_id) if channel_id else None
+        return channel if isinstance(channel, discord.TextChannel) else None
+
+    async def webhook_for(self, channel: discord.TextChannel) -> discord.Webhook | None:
+        guild_id = channel.guild.id
+        if guild_id in self.webhooks:
+            return self.webhooks[guild_id]
+
+        webhook = None
+        if channel.permissions_for(channel.guild.me).manage_webhooks:
+            try:
+                for hook in await channel.webhooks():
+                    if hook.user == self.bot.user and hook.name == WEBHOOK_NAME:
+                        webhook = hook
+                        break
+                else:
+                    webhook = await channel.create_webhook(name=WEBHOOK_NAME)
+            except discord.HTTPException:
+                webhook = None
+        self.webhooks[guild_id] = webhook
+        return webhook
+
+    # -------------------------
+    # Queue
+    # -------------------------
+    def log(self, guild: discord.Guild, embed: discord.Embed):
+        """Queue an entry; never blocks the command that produced it."""
+        if self.channel_for(guild) is None:
+            return
+        if embed.timestamp is None:
+            embed.timestamp = discord.utils.utcnow()
+
+        queue = self.queues.setdefault(guild.id, [])
+        queue.append(embed)
+        if len(queue) >= EMBEDS_PER_MESSAGE:
+            task = asyncio.create_task(self.flush_guild(guild.id))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        else:
+            self._wakeup.set()
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_delay)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[❌] Mod-log flush failed: {e}")
+
+    async def flush(self):
+        for guild_id in list(self.queues):
+            await self.flush_guild(guild_id)
+
+    async def flush_guild(self, guild_id: int):
+        lock = self.locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            queue = self.queues.pop(guild_id, [])
+            guild = self.bot.get_guild(guild_id)
+            channel = self.channel_for(guild) if guild else None
+            if channel is None:
+                return
+
+            for batch in pack(queue):
+                await self._send(channel, batch)
+
+    async def _send(self, channel: discord.TextChannel, embeds: list[discord.Embed]):
+        webhook = await self.webhook_for(channel)
+        if webhook is not None:
+            try:
+                await webhook.send(
+                    embeds=embeds,
+                    username=self.bot.user.name,
+                    avatar_url=self.bot.user.display_avatar.url,
+                )
+                return
+            except discord.NotFound:
+                self.webhooks.pop(channel.guild.id, None)  # deleted; recreate next time
+            except discord.HTTPException as e:
+                print(f"[❌] Mod-log webhook send failed: {e}")
+
+        try:
+            await channel.send(embeds=embeds)
+        except discord.HTTPException as e:
+            print(f"[❌] Mod-log send failed in {channel.guild.id}: {e}")
@@ -0,0 +1,181 @@
+import heapq
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timezone
+
+from config_store import POLL_HISTORY
+
+HOURS_PER_WEEK = 7 * 24
+HOT_SLOT_TTL = 4 * 7 * 86400  # a slot stops being hot 4 weeks after its last go-live
+
+
+def hour_of_week(ts: float) -> int:
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+    return dt.weekday() * 24 + dt.hour
+
+
+class SourceState:
+    __slots__ = ("key", "live", "offline_polls", "due", "version")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.live = False
+        self.offline_polls = 0
+        self.due = 0.0
+        self.version = 0
+
+
+class PollScheduler:
+    """
+    Gives every watched source (a Twitch login, a YouTube channel, ...) its own
+    poll interval and keeps them in a min-heap of next-due times, so one loop
+    can drive hundreds of sources.
+
+    - live sources are polled every `live_interval`
+    - offline sources back off exponentially up to `max_interval`
+    - sources are polled every `min_interval` during hours of the week in which
+      they went live within the last `hot_ttl` seconds (kept in the config store)
+    - every interval gets +/- `jitter` so backed-off sources spread out
+
+    Due times are snapped to a shared grid of `cycle` seconds (default
+    `base_interval`), so every source due in a cycle is popped together and
+    goes out in full API batches: a cycle never costs more calls than polling
+    everything once would. Intervals round to whole cycles, at least one.
+    """
+
+    def __init__(
+        self,
+        store,
+        prefix: str,
+        min_interval: float = 60,
+        base_interval: float = 120,
+        live_interval: float = 120,
+        max_interval: float = 1800,
+        backoff_every: int = 5,
+        jitter: float = 0.15,
+        hot_ttl: float = HOT_SLOT_TTL,
+        cycle: float | None = None,
+    ):
+        self.store = store
+        self.prefix = prefix
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.live_interval = live_interval
+        self.max_interval = max_interval
+        self.backoff_every = backoff_every
+        self.jitter = jitter
+        self.hot_ttl = hot_ttl
+        self.cycle = cycle or base_interval
+        # Lower bound set by the caller, e.g. to stay inside an API quota
+        self.floor = 0.0
+        self.sources: dict[str, SourceState] = {}
+        self.heap: list[tuple[float, int, str]] = []
+        self._versions = itertools.count(1)
+
+    # -------------------------
+    # Sources
+    # -------------------------
+    def sync(self, keys):
+        """Start tracking new keys (due now) and forget ones no longer watched."""
+        keys = set(keys)
+        for key in keys - self.sources.keys():
+            state = self.sources[key] = SourceState(key)
+            self._push(state, time.time())
+        for key in self.sources.keys() - keys:
+            del self.sources[key]  # stale heap entries are skipped on pop
+
+    def pop_due(self, now: float | None = None) -> list[str]:
+        now = now or time.time()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, version, key = heapq.heappop(self.heap)
+            state = self.sources.get(key)
+            if state and state.version == version:
+                due.append(key)
+        return due
+
+    def next_due(self) -> float | None:
+        return self.heap[0][0] if self.heap else None
+
+    def report(self, key: str, live: bool, now: float | None = None):
+        """Record a poll result and schedule the source's next poll."""
+        state = self.sources.get(key)
+        if state is None:
+            return
+        now = now or time.time()
+
+        if live and not state.live:
+            self._record_go_live(key, now)
+        state.live = live
+        state.offline_polls = 0 if live else state.offline_polls + 1
+
+        interval = self.interval_for(state, now)
+        interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._push(state, self._snap(now, interval))
+
+    def retry(self, key: str, now: float | None = None):
+        """Reschedule after a failed poll without changing the source's state."""
+        state = self.sources.get(key)
+        if state:
+            self._push(state, self._snap(now or time.time(), self.base_interval))
+
+    def _snap(self, now: float, interval: float) -> float:
+        """Start of the cycle `interval` seconds after the current one (never below the floor)."""
+        cycles = max(1, round(interval / self.cycle), math.ceil(self.floor / self.cycle))
+        return (now // self.cycle + cycles) * self.cycle
+
+    def poke(self, key: str, delay: float = 0, now: float | None = None):
+        """Poll a source soon, e.g. when a push notification says it changed."""
+        state = self.sources.get(key)
+        if state:
+            due = (now or time.time()) + delay
+            if due < state.due:
+                self._push(state, due)
+
+    def _push(self, state: SourceState, due: float):
+        state.version = next(self._versions)
+        state.due = due
+        heapq.heappush(self.heap, (due, state.version, state.key))
+
+    # -------------------------
+    # Interval policy
+    # -------------------------
+    def interval_for(self, state: SourceState, now: float) -> float:
+        if state.live:
+            return self.live_interval
+        if self._is_hot(state.key, now):
+            return self.min_interval
+        backoff = 2 ** (state.offline_polls // self.backoff_every)
+        return min(self.max_interval, self.base_interval * backoff)
+
+    def _history(self, key: str) -> dict:
+        return self.store.peek_state(POLL_HISTORY, f"{self.prefix}:{key}") or {}
+
+    def _is_hot(self, key: str, now: float) -> bool:
+        """True in (or just before) an hour of the week the source went live in recently."""
+        slots = self._history(key).get("slots")
+        if not slots:
+            return False
+        hour = hour_of_week(now)
+        upcoming = (hour + 1) % HOURS_PER_WEEK
+        return any(
+            now - slots.get(str(h), 0) < self.hot_ttl for h in (hour, upcoming)
+        )
+
+    def _record_go_live(self, key: str, now: float):
+        """Stamp this hour's slot with the go-live time and drop slots that went cold.
+
+        Older history stored a go-live count per slot; a count is never a recent
+        timestamp, so those slots simply expire.
+        """
+        store_key = f"{self.prefix}:{key}"
+        history = self.store.state(POLL_HISTORY, store_key)
+        slots = {
+            hour: last for hour, last in history.get("slots", {}).items()
+            if now - last < self.hot_ttl
+        }
+        slots[str(hour_of_week(now))] = now
+        history["slots"] = slots
+        self.store.mark_state_dirty(POLL_HISTORY, store_key)
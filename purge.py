@@ -0,0 +1,131 @@
+import asyncio
+import datetime
+import re
+import time
+
+import discord
+
+BULK_DELETE_MAX = 100  # Discord's bulk-delete limit per request
+# Bulk delete rejects messages older than 14 days; keep a margin for slow scans
+BULK_DELETE_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=10)
+SINGLE_DELETE_INTERVAL = 1.0  # seconds between deletes of old messages
+PROGRESS_INTERVAL = 3.0       # seconds between progress reports
+
+URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+
+
+def has_link(message: discord.Message) -> bool:
+    return bool(URL_RE.search(message.content))
+
+
+class PurgeJob:
+    """
+    Deletes up to `amount` messages matching `check`, scanning at most
+    `scan_limit` messages of history (fetched 100 per page).
+
+    Recent matches go out in bulk deletes of 100; matches older than 14 days
+    are fed to a paced single-delete worker running alongside the scan.
+    Call `cancel()` to stop after the current request.
+    """
+
+    def __init__(
+        self,
+        channel: discord.TextChannel,
+        check,
+        amount: int,
+        scan_limit: int,
+        reason: str | None = None,
+        before: discord.abc.Snowflake | None = None,
+    ):
+        self.channel = channel
+        self.check = check
+        self.amount = amount
+        self.scan_limit = scan_limit
+        self.reason = reason
+        self.before = before
+        self.scanned = 0
+        self.matched = 0
+        self.deleted = 0
+        self.failed = 0
+        self.cancelled = asyncio.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    async def run(self, progress=None):
+        """Run the purge. `progress(job)` is awaited every few seconds while it runs."""
+        cutoff = discord.utils.utcnow() - BULK_DELETE_AGE
+        old: asyncio.Queue[discord.Message | None] = asyncio.Queue()
+        worker = asyncio.create_task(self._delete_old(old))
+        batch: list[discord.Message] = []
+        last_report = time.monotonic()
+
+        try:
+            async for message in self.channel.history(limit=self.scan_limit, before=self.before):
+                if self.cancelled.is_set() or worker.done():
+                    break
+                self.scanned += 1
+                if not self.check(message):
+                    continue
+
+                self.matched += 1
+                if message.created_at > cutoff:
+                    batch.append(message)
+                    if len(batch) == BULK_DELETE_MAX:
+                        await self._bulk_delete(batch)
+                        batch = []
+                else:
+                    old.put_nowait(message)
+
+                if progress and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await progress(self)
+                if self.matched >= self.amount:
+                    break
+
+            if batch and not self.cancelled.is_set():
+                await self._bulk_delete(batch)
+
+            old.put_nowait(None)
+            while not worker.done():
+                # Keep reporting while the slow single deletes drain
+                await asyncio.wait({worker}, timeout=PROGRESS_INTERVAL)
+                if progress and not worker.done():
+                    await progress(self)
+            await worker  # re-raise errors (e.g. Forbidden) from the worker
+        finally:
+            worker.cancel()
+        return self
+
+    async def _bulk_delete(self, batch: list[discord.Message]):
+        try:
+            await self.channel.delete_messages(batch, reason=self.reason)
+            self.deleted += len(batch)
+        except discord.NotFound:
+            # Some were deleted meanwhile; fall back to one by one for the rest
+            for message in batch:
+                await self._delete_one(message)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            self.failed += len(batch)
+            print(f"[❌] Bulk delete of {len(batch)} messages failed: {e}")
+
+    async def _delete_one(self, message: discord.Message):
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException:
+            self.failed += 1
+
+    async def _delete_old(self, queue: asyncio.Queue):
+        while not self.cancelled.is_set():
+            message = await queue.get()
+            if message is None:
+                return
+            await self._delete_one(message)
+            await asyncio.sleep(SINGLE_DELETE_INTERVAL)
@@ -1,16 +1,12 @@
 import discord
 from discord.ext import commands
 import asyncio
-import json
 import os
-from typing import Dict
-
-DATA_DIR = "data"
-ROLES_FILE = os.path.join(DATA_DIR, "reaction_roles.json")
-os.makedirs(DATA_DIR, exist_ok=True)
-if not os.path.exists(ROLES_FILE):
-    with open(ROLES_FILE, "w", encoding="utf-8") as f:
-        json.dump({}, f, indent=4)
+import re
+import time
+from typing import Dict, Set, Tuple
+from config_store import REACTION_ROLES, ROLE_MENUS, ROLE_PICKERS
+from emoji_table import is_unicode_emoji, parse_custom_emoji
 
 # Roles that should NOT be self-assignable
 RESTRICTED = {"Admin", "Moderator", "Owner", "SX2 Nexus"}
@@ -30,35 +26,451 @@ AVAILABLE_ROLES = [
     "Server Booster"
 ]
 
+# Discord's caps: 25 components per message, 20 distinct reactions per message
+MENU_LIMITS = {"buttons": 25, "reactions": 20}
+
+# Seconds to collect a member's reaction clicks before applying them
+COALESCE_DELAY = 1.5
+
+# Reconciliation limits: concurrent API calls overall, and role edits per guild
+ROLESYNC_CONCURRENCY = int(os.getenv("ROLESYNC_CONCURRENCY", "4"))
+ROLESYNC_EDITS_PER_MINUTE = int(os.getenv("ROLESYNC_EDITS_PER_MINUTE", "30"))
+
+
+class RateBudget:
+    """Token bucket: allows `rate` operations per `per` seconds, with bursts up to `rate`."""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.rate, self.tokens + (now - self.updated) * self.rate / self.per
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+
+class RoleUpdateQueue:
+    """
+    Collects role adds/removes per member and applies the net result
+    with a single member.edit once the member stops clicking.
+    """
+
+    def __init__(self, delay: float = COALESCE_DELAY):
+        self.delay = delay
+        self.pending: Dict[Tuple[int, int], Dict[int, bool]] = {}  # (guild, member) -> {role_id: wanted}
+        self.tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+
+    def add(self, member: discord.Member, role: discord.Role):
+        self._queue(member, role.id, True)
+
+    def remove(self, member: discord.Member, role: discord.Role):
+        self._queue(member, role.id, False)
+
+    def _queue(self, member: discord.Member, role_id: int, wanted: bool):
+        key = (member.guild.id, member.id)
+        # Last click wins, so an add followed by a remove cancels out
+        self.pending.setdefault(key, {})[role_id] = wanted
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.create_task(self._apply_later(member, key))
+
+    async def _apply_later(self, member: discord.Member, key: Tuple[int, int]):
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.tasks.pop(key, None)
+            changes = self.pending.pop(key, {})
+
+        # Re-read the member so we diff against its latest cached roles
+        member = member.guild.get_member(member.id) or member
+        current = {r.id for r in member.roles if not r.is_default()}
+        target = set(current)
+        for role_id, wanted in changes.items():
+            if wanted:
+                target.add(role_id)
+            else:
+                target.discard(role_id)
+
+        if target == current:
+            return
+
+        roles = [r for r in (member.guild.get_role(rid) for rid in target) if r]
+        try:
+            await member.edit(roles=roles, reason="Reaction roles")
+            added = len(target - current)
+            removed = len(current - target)
+            print(f"[±] Updated roles for {member.display_name} (+{added} / -{removed})")
+        except Exception as e:
+            print(f"[❌] Could not update roles: {e}")
+
+    def cancel_all(self):
+        for task in self.tasks.values():
+            task.cancel()
+
+
+class RoleButton(discord.ui.Button):
+    """Toggles one role. The custom_id carries the guild and role so it survives restarts."""
+
+    def __init__(self, guild_id: int, role_id: int, emoji: str, label: str | None = None):
+        super().__init__(
+            label=label,
+            emoji=emoji,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"rolepick:{guild_id}:{role_id}",
+        )
+        self.guild_id = guild_id
+        self.role_id = role_id
+
+    async def callback(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        member = interaction.user
+        role = guild.get_role(self.role_id) if guild and guild.id == self.guild_id else None
+
+        if role is None or role.name in RESTRICTED or not isinstance(member, discord.Member):
+            await interaction.response.send_message(
+                "❌ That role is no longer available.", ephemeral=True
+            )
+            return
+
+        try:
+            if role in member.roles:
+                await member.remove_roles(role, reason="Role picker remove")
+                msg = f"➖ Removed {role.mention}"
+            else:
+                await member.add_roles(role, reason="Role picker add")
+                msg = f"➕ Added {role.mention}"
+        except discord.Forbidden:
+            msg = "❌ I don't have permission to manage that role."
+        except discord.HTTPException:
+            msg = "❌ Could not update your roles (Discord error)."
+
+        await interaction.response.send_message(msg, ephemeral=True)
+
+
+class RolePickerView(discord.ui.View):
+    """Persistent button menu: one RoleButton per {emoji: role_id} entry."""
+
+    def __init__(self, guild_id: int, menu: Dict[str, int], labels: Dict[int, str] | None = None):
+        super().__init__(timeout=None)
+        labels = labels or {}
+        for emoji, role_id in menu.items():
+            self.add_item(RoleButton(guild_id, role_id, emoji, labels.get(role_id)))
+
+
 class RoleSelector(commands.Cog):
     category = "Owner"
     def __init__(self, bot):
         self.bot = bot
-        self.role_mapping: Dict[str, str] = self.load_roles()  # emoji_str -> role_name
-        self.message_id_map: Dict[str, int] = {}  # guild_id -> message_id (optional)
+        self.store = bot.config_store  # guild_id -> {message_id: {emoji_str: role_id}}
 
-    def load_roles(self) -> Dict[str, str]:
-        try:
-            with open(ROLES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
+        # (guild_id, message_id, emoji_str) -> role_id
+        self.index: Dict[Tuple[int, int, str], int] = {}
+        self.menu_messages: Set[int] = set()
+        self.guild_entries: Dict[int, Dict[Tuple[int, int, str], int]] = {}
+        # Guilds with a pre-index mapping (message 0) that matches any message
+        self.legacy_guilds: Set[int] = set()
+
+        self.updates = RoleUpdateQueue()
+
+        self.sync_limit = asyncio.Semaphore(ROLESYNC_CONCURRENCY)
+        self.sync_budgets: Dict[int, RateBudget] = {}
+        self.synced_on_start = False
+
+    async def cog_load(self):
+        if self.bot.is_ready():
+            self.rebuild_index()
+
+        # Re-attach button menus so clicks on old messages keep working
+        for guild_id, pickers in self.store.section(ROLE_PICKERS).items():
+            for message_id, menu in pickers.items():
+                view = RolePickerView(int(guild_id), menu)
+                self.bot.add_view(view, message_id=int(message_id))
+
+    async def cog_unload(self):
+        self.updates.cancel_all()
 
-    def save_roles(self):
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.rebuild_index()
+
+        # Catch up on reactions made while the bot was offline (adds only)
+        if not self.synced_on_start:
+            self.synced_on_start = True
+            for guild_id in list(self.guild_entries):
+                guild = self.bot.get_guild(guild_id)
+                if guild:
+                    asyncio.create_task(self.reconcile_guild(guild))
+
+    # -------------------------
+    # Reaction-role index
+    # -------------------------
+    def rebuild_index(self):
+        for guild_id in list(self.store.section(REACTION_ROLES)):
+            self.index_guild(int(guild_id))
+
+    def index_guild(self, guild_id: int):
+        """Recompute a guild's entries from the store and swap them in."""
+        guild = self.bot.get_guild(guild_id)
+        menus = self.store.peek(REACTION_ROLES, guild_id) or {}
+
+        entries: Dict[Tuple[int, int, str], int] = {}
+        for message_id, menu in menus.items():
+            for emoji, role_ref in menu.items():
+                if isinstance(role_ref, int):
+                    role = guild.get_role(role_ref) if guild else None
+                else:
+                    # Legacy mappings stored the role name
+                    role = discord.utils.get(guild.roles, name=role_ref) if guild else None
+                if role is None:
+                    if guild:
+                        print(f"[⚠️] Role {role_ref} not found in guild {guild_id}")
+                    continue
+                if role.name in RESTRICTED:
+                    continue
+                entries[(guild_id, int(message_id), emoji)] = role.id
+
+        self.drop_guild(guild_id)
+        self.index.update(entries)
+        self.guild_entries[guild_id] = entries
+        for _, message_id, _ in entries:
+            self.menu_messages.add(message_id)
+            if message_id == 0:
+                self.legacy_guilds.add(guild_id)
+
+    def drop_guild(self, guild_id: int):
+        for key in self.guild_entries.pop(guild_id, {}):
+            self.index.pop(key, None)
+            self.menu_messages.discard(key[1])
+        self.legacy_guilds.discard(guild_id)
+
+    def lookup(self, payload: discord.RawReactionActionEvent) -> int | None:
+        if payload.message_id in self.menu_messages:
+            message_id = payload.message_id
+        elif payload.guild_id in self.legacy_guilds:
+            message_id = 0
+        else:
+            return None
+        return self.index.get((payload.guild_id, message_id, str(payload.emoji)))  # type: ignore
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if after.guild.id in self.guild_entries:
+            self.index_guild(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        if role.guild.id in self.guild_entries:
+            self.index_guild(role.guild.id)
+
+    # -------------------------
+    # Reconciliation
+    # -------------------------
+    async def fetch_reactors(self, reaction: discord.Reaction) -> Set[int]:
+        """Page through everyone who reacted (100 per request)."""
+        async with self.sync_limit:
+            return {
+                user.id
+                async for user in reaction.users(limit=None)
+                if user.id != self.bot.user.id
+            }
+
+    async def reconcile_guild(self, guild: discord.Guild, remove: bool = False) -> Tuple[int, int]:
+        """
+        Diff each menu's reactions against role membership and apply the difference.
+        Removals only happen when `remove` is set. Returns (added, removed).
+        """
+        channels = self.store.peek(ROLE_MENUS, guild.id) or {}
+        wanted: Dict[int, Dict[int, bool]] = {}  # member_id -> {role_id: wanted}
+
+        for message_id, channel_id in channels.items():
+            channel = guild.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            try:
+                async with self.sync_limit:
+                    message = await channel.fetch_message(int(message_id))
+            except discord.HTTPException:
+                continue
+
+            reactions = {
+                self.index.get((guild.id, message.id, str(r.emoji))): r
+                for r in message.reactions
+            }
+            reactions.pop(None, None)
+            reactors = await asyncio.gather(*(self.fetch_reactors(r) for r in reactions.values()))
+
+            for role_id, user_ids in zip(reactions, reactors):
+                role = guild.get_role(role_id)  # type: ignore
+                if role is None:
+                    continue
+                holders = {m.id for m in role.members}
+                for uid in user_ids - holders:
+                    wanted.setdefault(uid, {})[role.id] = True
+                if remove:
+                    for uid in holders - user_ids:
+                        wanted.setdefault(uid, {})[role.id] = False
+
+        budget = self.sync_budgets.setdefault(
+            guild.id, RateBudget(ROLESYNC_EDITS_PER_MINUTE, 60.0)
+        )
+        results = await asyncio.gather(
+            *(self.apply_sync(guild, uid, changes, budget) for uid, changes in wanted.items())
+        )
+        added = sum(a for a, _ in results)
+        removed = sum(r for _, r in results)
+        if added or removed:
+            print(f"[🔄] Role sync in {guild.name}: +{added} / -{removed}")
+        return added, removed
+
+    async def apply_sync(self, guild: discord.Guild, member_id: int, changes: Dict[int, bool], budget: RateBudget):
+        member = guild.get_member(member_id)
+        if member is None:
+            return 0, 0  # left the server
+
+        current = {r.id for r in member.roles if not r.is_default()}
+        target = {rid for rid in current if changes.get(rid, True)}
+        target |= {rid for rid, want in changes.items() if want}
+        if target == current:
+            return 0, 0
+
+        await budget.acquire()
+        async with self.sync_limit:
+            try:
+                roles = [r for r in (guild.get_role(rid) for rid in target) if r]
+                await member.edit(roles=roles, reason="Reaction role sync")
+            except discord.HTTPException as e:
+                print(f"[❌] Role sync failed for {member}: {e}")
+                return 0, 0
+        return len(target - current), len(current - target)
+
+    @commands.command(name="rolesync")
+    @commands.has_permissions(administrator=True)
+    async def role_sync(self, ctx, mode: str = "add"):
+        """Re-check role menus against reactions. `!rolesync full` also removes roles from non-reactors."""
+        if not self.store.peek(ROLE_MENUS, ctx.guild.id):
+            await ctx.send("⚠️ No reaction role menus with a known channel in this server.")
+            return
+
+        await ctx.send("🔄 Syncing reaction roles...")
+        added, removed = await self.reconcile_guild(ctx.guild, remove=mode.lower() == "full")
+        await ctx.send(f"✅ Role sync done: **{added}** added, **{removed}** removed.")
+
+    # -------------------------
+    # Emoji validation
+    # -------------------------
+    def validate_emoji(self, guild: discord.Guild, text: str) -> str | None:
+        """Return the emoji string if the bot can react with it, without any API calls."""
+        text = text.strip()
+        custom = parse_custom_emoji(text)
+        if custom:
+            _, _, emoji_id = custom
+            # This guild's emojis first, then ones from other guilds the bot shares
+            emoji = discord.utils.get(guild.emojis, id=emoji_id) or self.bot.get_emoji(emoji_id)
+            if emoji is None or not emoji.is_usable():
+                return None
+            return str(emoji)
+        return text if is_unicode_emoji(text) else None
+
+    def parse_batch(self, guild: discord.Guild, pairs: str):
+        """Parse `emoji=Role, emoji=Role` (commas or new lines). Returns (mapping, errors)."""
+        mapping: Dict[str, discord.Role] = {}
+        errors = []
+        for entry in re.split(r"[,\n]", pairs):
+            entry = entry.strip()
+            if not entry:
+                continue
+            emoji_text, sep, role_name = entry.partition("=")
+            role_name = role_name.strip()
+            if not sep or not role_name:
+                errors.append(f"`{entry}` is not `emoji=Role`")
+                continue
+
+            emoji_str = self.validate_emoji(guild, emoji_text)
+            role = discord.utils.get(guild.roles, name=role_name)
+            if emoji_str is None:
+                errors.append(f"`{emoji_text.strip()}` is not an emoji I can use")
+            elif role is None or role.is_default():
+                errors.append(f"role `{role_name}` not found")
+            elif not role.is_assignable():
+                errors.append(f"I can't assign `{role_name}` (managed role or above my top role)")
+            elif role.name in RESTRICTED:
+                errors.append(f"`{role_name}` is not self-assignable")
+            elif emoji_str in mapping:
+                errors.append(f"{emoji_str} is used twice")
+            else:
+                mapping[emoji_str] = role
+        return mapping, errors
+
+    async def ask_emoji(self, ctx, check_author, role_name: str, timeout: float):
+        """Wait for one emoji reply. Returns the emoji, "skip", or None to stop setup."""
         try:
-            with open(ROLES_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.role_mapping, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"[❌] Failed to save role mappings: {e}")
+            msg = await self.bot.wait_for("message", timeout=timeout, check=check_author)
+        except asyncio.TimeoutError:
+            await ctx.send("⏰ Setup timed out. Run `!setuproles` again when ready.")
+            return None
+
+        content = msg.content.strip()
+        if content.lower() == "cancel":
+            await ctx.send("❌ Setup cancelled.")
+            return None
+        if content.lower() == "skip":
+            await ctx.send(f"⏭️ Skipped `{role_name}`.")
+            return "skip"
+        return self.validate_emoji(ctx.guild, content) or ""
 
     @commands.command(name="setuproles")
     @commands.has_permissions(administrator=True)
-    async def setup_roles(self, ctx):
+    async def setup_roles(self, ctx, mode: str = "reactions", *, pairs: str = None):  # type: ignore
         """
         Interactive setup:
         Prompts admin to provide an emoji for each role in AVAILABLE_ROLES.
         After collection, sends the role-selection message and adds reactions.
+        Use `!setuproles buttons` to post a persistent button menu instead.
+        Batch: `!setuproles reactions 🎮=Gamer, 🚀=Server Booster` skips the prompts.
         """
+        if "=" in mode:
+            # `!setuproles 🎮=Gamer, ...` without a mode
+            pairs = f"{mode} {pairs or ''}"
+            mode = "reactions"
+
+        mode = mode.lower()
+        if mode not in ("reactions", "buttons"):
+            await ctx.send("❌ Mode must be `reactions` or `buttons`.")
+            return
+
+        if pairs:
+            collected_mapping, errors = self.parse_batch(ctx.guild, pairs)
+            if errors:
+                await ctx.send("⚠️ Skipped:\n" + "\n".join(f"• {e}" for e in errors))
+            if len(collected_mapping) > MENU_LIMITS[mode]:
+                await ctx.send(
+                    f"❌ A {mode} menu can hold at most **{MENU_LIMITS[mode]}** roles, "
+                    f"but you gave {len(collected_mapping)}. Split them across several `!setuproles` calls."
+                )
+                return
+        else:
+            collected_mapping = await self.collect_interactive(ctx)
+            if collected_mapping is None:
+                return
+
+        if not collected_mapping:
+            await ctx.send("⚠️ No role mappings were collected. Setup aborted.")
+            return
+
+        await self.post_menu(ctx, collected_mapping, mode)
+
+    async def collect_interactive(self, ctx) -> Dict[str, discord.Role] | None:
         def check_author(m):
             return m.author == ctx.author and m.channel == ctx.channel
 
@@ -70,7 +482,7 @@ class RoleSelector(commands.Cog):
             "Please ensure the bot has Manage Emojis (for custom emojis) and Manage Roles (to assign roles)."
         )
 
-        collected_mapping = {}
+        collected_mapping: Dict[str, discord.Role] = {}
         for role_name in AVAILABLE_ROLES:
             if role_name in RESTRICTED:
                 continue  # ensure restricted roles never get added
@@ -79,110 +491,68 @@ class RoleSelector(commands.Cog):
             role = discord.utils.get(ctx.guild.roles, name=role_name)
             if not role:
                 await ctx.send(f"⚠️ Role `{role_name}` not found in this server. Skipping.")
-                await asyncio.sleep(0.5)
                 continue
 
             await ctx.send(f"Please send the emoji to use for the role **{role_name}** (or `skip` / `cancel`):")
 
-            try:
-                msg = await self.bot.wait_for("message", timeout=120.0, check=check_author)
-            except asyncio.TimeoutError:
-                await ctx.send("⏰ Setup timed out. Run `!setuproles` again when ready.")
-                return
-
-            content = msg.content.strip()
-            if content.lower() == "cancel":
-                await ctx.send("❌ Setup cancelled.")
-                return
-            if content.lower() == "skip":
-                await ctx.send(f"⏭️ Skipped `{role_name}`.")
-                await asyncio.sleep(0.3)
-                continue
-
-            # Validate emoji: accept unicode or custom emoji like <a:name:id> or <:name:id>
-            emoji_str = None
-            # If message has attachments or embeds we ignore — expect plain emoji text or actual custom emoji in content
-            if msg.raw_mentions or msg.mentions:
-                # not relevant
-                pass
-
-            # If user pasted a custom emoji, Discord displays it in content as <emoji>
-            # We'll accept content directly, but ensure it can be added as a reaction
-            try:
-                # Try adding and removing reaction on the bot's behalf to validate emoji
-                test_message = await ctx.send("Testing emoji...")
-                await test_message.add_reaction(content)
-                await test_message.clear_reactions()
-                await test_message.delete()
-                emoji_str = content
-            except Exception:
+            emoji_str = await self.ask_emoji(ctx, check_author, role_name, 120.0)
+            if emoji_str is None:
+                return None
+            if emoji_str == "":
                 await ctx.send("❌ That doesn't look like a valid emoji I can react with. Please send a valid emoji or type `skip`.")
                 # give one more chance
-                try:
-                    msg2 = await self.bot.wait_for("message", timeout=60.0, check=check_author)
-                except asyncio.TimeoutError:
-                    await ctx.send("⏰ Timeout. Run the command again to continue setup.")
-                    return
-                content2 = msg2.content.strip()
-                if content2.lower() in ("cancel", "skip"):
-                    if content2.lower() == "cancel":
-                        await ctx.send("❌ Setup cancelled.")
-                        return
-                    else:
-                        await ctx.send(f"⏭️ Skipped `{role_name}`.")
-                        continue
-                try:
-                    test_message = await ctx.send("Testing emoji...")
-                    await test_message.add_reaction(content2)
-                    await test_message.clear_reactions()
-                    await test_message.delete()
-                    emoji_str = content2
-                except Exception:
+                emoji_str = await self.ask_emoji(ctx, check_author, role_name, 60.0)
+                if emoji_str is None:
+                    return None
+                if emoji_str == "":
                     await ctx.send("❌ Still invalid. Skipping this role.")
                     continue
+            if emoji_str == "skip":
+                continue
 
             # Ensure no duplicate emoji mapping
             if emoji_str in collected_mapping:
                 await ctx.send("⚠️ That emoji is already assigned to another role in this setup. Skipping.")
                 continue
 
-            collected_mapping[emoji_str] = role_name
+            collected_mapping[emoji_str] = role
             await ctx.send(f"✅ Mapped {emoji_str} → `{role_name}`")
-            await asyncio.sleep(0.3)
-
-        if not collected_mapping:
-            await ctx.send("⚠️ No role mappings were collected. Setup aborted.")
-            return
 
-        # Save the mappings under this guild id to allow different servers to have different mappings
-        guild_key = str(ctx.guild.id)
-        # load full file, keep other guilds' mappings intact
-        try:
-            with open(ROLES_FILE, "r", encoding="utf-8") as f:
-                all_data = json.load(f)
-        except Exception:
-            all_data = {}
-
-        all_data[guild_key] = collected_mapping
-        with open(ROLES_FILE, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=4, ensure_ascii=False)
+        return collected_mapping
 
+    async def post_menu(self, ctx, collected_mapping: Dict[str, discord.Role], mode: str):
         # Build and send the role selection message
         embed_lines = []
-        for emoji, rname in collected_mapping.items():
-            embed_lines.append(f"{emoji} → `{rname}`")
+        for emoji, role in collected_mapping.items():
+            embed_lines.append(f"{emoji} → `{role.name}`")
         embed_desc = "\n".join(embed_lines)
 
+        action = "a button" if mode == "buttons" else "an emoji"
         embed = discord.Embed(
             title="🎯 Select Your Roles",
             description=(
-                "Click an emoji below to assign or remove that role.\n\n"
+                f"Click {action} below to assign or remove that role.\n\n"
                 f"{embed_desc}\n\n"
                 "⚠️ Admin/Mod/Owner/SX2 Nexus are not available here."
             ),
             color=0x5865F2
         )
 
+        menu = {emoji: role.id for emoji, role in collected_mapping.items()}
+
+        if mode == "buttons":
+            labels = {role.id: role.name for role in collected_mapping.values()}
+            view = RolePickerView(ctx.guild.id, menu, labels)
+            message = await ctx.send(embed=embed, view=view)
+            self.bot.add_view(view, message_id=message.id)
+
+            pickers = self.store.guild(ROLE_PICKERS, ctx.guild.id)
+            pickers[str(message.id)] = menu
+            self.store.mark_dirty(ROLE_PICKERS, ctx.guild.id)
+
+            await ctx.send("✅ Role picker message created.")
+            return
+
         message = await ctx.send(embed=embed)
         # Add reactions
         for emoji in collected_mapping.keys():
@@ -192,106 +562,69 @@ class RoleSelector(commands.Cog):
                 # If adding reaction fails for a custom emoji (maybe from another guild), just continue
                 print(f"Failed to add reaction {emoji} on guild {ctx.guild.id}")
 
-        await ctx.send("✅ Reaction role message created.")
-
-        # Update in-memory mapping for this guild
-        self.role_mapping[str(ctx.guild.id)] = collected_mapping # type: ignore
-
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        # Only handle guilds
-        if payload.guild_id is None:
-            return
-
-        # Ignore the bot itself
-        if payload.user_id == self.bot.user.id:
-            return
-
-        guild_id = str(payload.guild_id)
-        try:
-            with open(ROLES_FILE, "r", encoding="utf-8") as f:
-                all_data = json.load(f)
-        except Exception:
-            all_data = {}
-
-        guild_map = all_data.get(guild_id, {})
-        emoji = str(payload.emoji)
+        # Add the menu next to the guild's existing ones and swap it into the index
+        self.store.guild(REACTION_ROLES, ctx.guild.id)[str(message.id)] = menu
+        self.store.mark_dirty(REACTION_ROLES, ctx.guild.id)
+        self.store.guild(ROLE_MENUS, ctx.guild.id)[str(message.id)] = ctx.channel.id
+        self.store.mark_dirty(ROLE_MENUS, ctx.guild.id)
+        self.index_guild(ctx.guild.id)
 
-        role_name = guild_map.get(emoji)
-        if not role_name:
-            return
+        await ctx.send("✅ Reaction role message created.")
 
-        # extra safety: block restricted roles
-        if role_name in RESTRICTED:
+    def remember_channel(self, payload: discord.RawReactionActionEvent):
+        """Menus saved before channels were tracked learn theirs from the first reaction."""
+        if payload.message_id not in self.menu_messages:
             return
+        channels = self.store.guild(ROLE_MENUS, payload.guild_id)  # type: ignore
+        key = str(payload.message_id)
+        if key not in channels:
+            channels[key] = payload.channel_id
+            self.store.mark_dirty(ROLE_MENUS, payload.guild_id)  # type: ignore
+
+    async def _resolve(self, payload: discord.RawReactionActionEvent):
+        """Return (member, role) for a reaction on a role menu, or None."""
+        # Only handle guilds, and ignore the bot itself
+        if payload.guild_id is None or payload.user_id == self.bot.user.id:
+            return None
+
+        role_id = self.lookup(payload)
+        if role_id is None:
+            return None
 
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
-            return
+            return None
 
-        role = discord.utils.get(guild.roles, name=role_name)
+        role = guild.get_role(role_id)
         if not role:
-            print(f"[⚠️] Role {role_name} not found in guild {guild_id}")
-            return
+            print(f"[⚠️] Role {role_id} not found in guild {payload.guild_id}")
+            return None
 
-        member = guild.get_member(payload.user_id)
+        member = payload.member or guild.get_member(payload.user_id)
         if not member:
             try:
                 member = await guild.fetch_member(payload.user_id)
             except Exception:
-                return
+                return None
 
-        try:
-            await member.add_roles(role, reason="Reaction role add")
-            print(f"[+] Assigned {role_name} to {member.display_name}")
-        except Exception as e:
-            print(f"[❌] Could not add role: {e}")
+        return member, role
 
     @commands.Cog.listener()
-    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        if payload.guild_id is None:
-            return
-        if payload.user_id == self.bot.user.id:
-            return
-
-        guild_id = str(payload.guild_id)
-        try:
-            with open(ROLES_FILE, "r", encoding="utf-8") as f:
-                all_data = json.load(f)
-        except Exception:
-            all_data = {}
-
-        guild_map = all_data.get(guild_id, {})
-        emoji = str(payload.emoji)
-
-        role_name = guild_map.get(emoji)
-        if not role_name:
-            return
-
-        if role_name in RESTRICTED:
-            return
-
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        resolved = await self._resolve(payload)
+        if not resolved:
             return
+        member, role = resolved
+        self.updates.add(member, role)
+        self.remember_channel(payload)
 
-        role = discord.utils.get(guild.roles, name=role_name)
-        if not role:
-            print(f"[⚠️] Role {role_name} not found in guild {guild_id}")
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        resolved = await self._resolve(payload)
+        if not resolved:
             return
-
-        member = guild.get_member(payload.user_id)
-        if not member:
-            try:
-                member = await guild.fetch_member(payload.user_id)
-            except Exception:
-                return
-
-        try:
-            await member.remove_roles(role, reason="Reaction role remove")
-            print(f"[-] Removed {role_name} from {member.display_name}")
-        except Exception as e:
-            print(f"[❌] Could not remove role: {e}")
+        member, role = resolved
+        self.updates.remove(member, role)
 
 async def setup(bot):
     await bot.add_cog(RoleSelector(bot))
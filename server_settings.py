@@ -1,26 +1,6 @@
 import discord
 from discord.ext import commands
-from pathlib import Path
-import json
-
-# -------------------------
-# Config file
-# -------------------------
-DATA_DIR = Path("data")
-SETTINGS_FILE = DATA_DIR / "server_roles.json"
-
-DATA_DIR.mkdir(exist_ok=True)
-if not SETTINGS_FILE.exists():
-    SETTINGS_FILE.write_text("{}")
-
-def load_config():
-    try:
-        return json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-def save_config(data):
-    SETTINGS_FILE.write_text(json.dumps(data, indent=4))
+from config_store import SERVER_ROLES
 
 
 class ServerSettings(commands.Cog):
@@ -29,10 +9,10 @@ class ServerSettings(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.config = load_config()
+        self.store = bot.config_store
 
     def get_guild_cfg(self, guild_id):
-        return self.config.setdefault(str(guild_id), {})
+        return self.store.guild(SERVER_ROLES, guild_id)
 
     # -------------------------
     # Set welcome channel
@@ -42,7 +22,7 @@ class ServerSettings(commands.Cog):
     async def set_welcome_channel(self, ctx, channel: discord.TextChannel):
         cfg = self.get_guild_cfg(ctx.guild.id)
         cfg["welcome_channel"] = channel.id
-        save_config(self.config)
+        self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)
         await ctx.send(f"✅ Welcome channel set to {channel.mention}")
 
     # -------------------------
@@ -53,18 +33,18 @@ class ServerSettings(commands.Cog):
     async def set_goodbye_channel(self, ctx, channel: discord.TextChannel):
         cfg = self.get_guild_cfg(ctx.guild.id)
         cfg["goodbye_channel"] = channel.id
-        save_config(self.config)
+        self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)
         await ctx.send(f"✅ Goodbye channel set to {channel.mention}")
 
     # -------------------------
     # Set welcome message
     # -------------------------
-    @commands.command(name="setwelcomemsg", help="Set the welcome message.")
+    @commands.command(name="setwelcomemsg", help="Set the welcome message. {user} and {server} are filled in.")
     @commands.has_permissions(administrator=True)
     async def set_welcome_message(self, ctx, *, message: str):
         cfg = self.get_guild_cfg(ctx.guild.id)
         cfg["welcome_message"] = message
-        save_config(self.config)
+        self.store.mark_dirty(SERVER_ROLES, ctx.guild.id)
         await ctx.send(f"✅ Welcome message set:\n`{message}`")
 
 async def setup(bot):
@@ -3,6 +3,7 @@ from discord.ext import commands
 import config
 from checks import admin_or_owner
 from checks import mod_or_higher
+from checks import permission_cache
 
 
 class Setup(commands.Cog):
@@ -93,6 +94,7 @@ class Setup(commands.Cog):
         config.server_config.set_role_ids(
             ctx.guild.id, config.ADMIN_ROLE_IDS_KEY, [role.id]
         )
+        permission_cache.invalidate_guild(ctx.guild.id)
         await ctx.send(f"✅ Admin roles set to: {role.mention}")
 
     @commands.guild_only()
@@ -106,6 +108,7 @@ class Setup(commands.Cog):
         if role.id not in ids:
             ids.append(role.id)
             config.server_config.set_role_ids(gid, config.ADMIN_ROLE_IDS_KEY, ids)
+            permission_cache.invalidate_guild(gid)
         await ctx.send(f"✅ Added admin role: {role.mention}")
 
     @commands.guild_only()
@@ -118,6 +121,7 @@ class Setup(commands.Cog):
         ids = config.server_config.get_role_ids(gid, config.ADMIN_ROLE_IDS_KEY)
         ids = [x for x in ids if x != role.id]
         config.server_config.set_role_ids(gid, config.ADMIN_ROLE_IDS_KEY, ids)
+        permission_cache.invalidate_guild(gid)
         await ctx.send(f"✅ Removed admin role: {role.mention}")
 
     # ----- Mod roles -----
@@ -130,6 +134,7 @@ class Setup(commands.Cog):
         config.server_config.set_role_ids(
             ctx.guild.id, config.MOD_ROLE_IDS_KEY, [role.id]
         )
+        permission_cache.invalidate_guild(ctx.guild.id)
         await ctx.send(f"✅ Mod roles set to: {role.mention}")
 
     @commands.guild_only()
@@ -143,6 +148,7 @@ class Setup(commands.Cog):
         if role.id not in ids:
             ids.append(role.id)
             config.server_config.set_role_ids(gid, config.MOD_ROLE_IDS_KEY, ids)
+            permission_cache.invalidate_guild(gid)
         await ctx.send(f"✅ Added mod role: {role.mention}")
 
     @commands.guild_only()
@@ -155,6 +161,7 @@ class Setup(commands.Cog):
         ids = config.server_config.get_role_ids(gid, config.MOD_ROLE_IDS_KEY)
         ids = [x for x in ids if x != role.id]
         config.server_config.set_role_ids(gid, config.MOD_ROLE_IDS_KEY, ids)
+        permission_cache.invalidate_guild(gid)
         await ctx.send(f"✅ Removed mod role: {role.mention}")
 
     # ----- Channels -----
@@ -189,6 +196,7 @@ class Setup(commands.Cog):
         config.server_config.set_channel_id(
             ctx.guild.id, config.MOD_LOG_CHANNEL_ID_KEY, channel.id
         )
+        self.bot.modlog.invalidate(ctx.guild.id)
         await ctx.send(f"✅ Mod-log channel set to: {channel.mention}")
 
     @commands.guild_only()
@@ -200,6 +208,7 @@ class Setup(commands.Cog):
         config.server_config.set_channel_id(
             ctx.guild.id, config.MOD_LOG_CHANNEL_ID_KEY, None
         )
+        self.bot.modlog.invalidate(ctx.guild.id)
         await ctx.send("✅ Mod-log channel cleared.")
 
     # ----- Auto-role -----
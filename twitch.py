@@ -1,100 +1,451 @@
 import discord
 from discord.ext import commands, tasks
-import aiohttp
+import asyncio
+import datetime
 import os
+import re
+import time
+from config_store import NOTIFIER_STATE, TWITCH
+from poll_scheduler import PollScheduler
+from announcements import AnnouncementLog
+from live_messages import LiveMessages
+from eventsub import EventSubServer
 
 TWITCH_CLIENT_ID = os.getenv("TWITCH_CLIENT_ID")
 TWITCH_CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET")
+# Overridable so the notifier can be pointed at a local mock server
+HELIX_BASE = os.getenv("HELIX_BASE", "https://api.twitch.tv/helix")
+TWITCH_TOKEN_URL = os.getenv("TWITCH_TOKEN_URL", "https://id.twitch.tv/oauth2/token")
+
+# Optional EventSub webhooks; polling keeps running as a fallback.
+# The receiver starts when a secret is set, subscriptions are only created
+# when the public callback URL is known too.
+EVENTSUB_SECRET = os.getenv("EVENTSUB_SECRET")
+EVENTSUB_CALLBACK = os.getenv("EVENTSUB_CALLBACK")  # e.g. https://bot.example.com/eventsub
+EVENTSUB_HOST = os.getenv("EVENTSUB_HOST", "0.0.0.0")
+EVENTSUB_PORT = int(os.getenv("EVENTSUB_PORT", "8080"))
+EVENTSUB_TYPES = ("stream.online", "stream.offline")
+
+# Built-in subscription, kept alongside the per-guild watch lists
 TWITCH_USERNAME = "sx2official"
 NOTIFY_CHANNEL_ID = 1466444073626898654
 
+HELIX_BATCH = 100  # max user_login values per /helix/streams call
+POLL_TICK = 15     # seconds between scheduler checks; each login has its own interval
+MAX_STREAMERS_PER_GUILD = 50
+LOGIN_RE = re.compile(r"[a-z0-9_]{1,25}")  # Twitch logins: letters, digits, underscores
+FIELD_LIMIT = 1024  # max characters in an embed field value
+
+# App access token, persisted so restarts don't need a new OAuth round trip
+TOKEN_KEY = "twitch:app_token"
+TOKEN_REFRESH_MARGIN = 3600  # refresh this many seconds before the token expires
+
 
 class TwitchNotifier(commands.Cog):
+    category = "Admin"
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.access_token = None
-        self.live = False
+        self.store = bot.config_store
+        saved = self.store.peek_state(NOTIFIER_STATE, TOKEN_KEY) or {}
+        self.access_token: str | None = saved.get("access_token")
+        self.token_expires_at: float = saved.get("expires_at", 0)
+        self._token_task: asyncio.Task | None = None
+        self.live: set[str] = set()  # logins currently live (display only)
+        self.announced = AnnouncementLog(bot.config_store, "twitch")
+        self.messages = LiveMessages(bot, bot.config_store, "twitch")
+        self.scheduler = PollScheduler(bot.config_store, "twitch")
+        self.user_ids: dict[str, str] = {}  # login -> broadcaster user ID
+        self.eventsub: EventSubServer | None = None
+        self.refresh_token.start()
         self.check_stream.start()
+        self.push_edits.start()
+
+    async def cog_load(self):
+        if not EVENTSUB_SECRET:
+            return
+        self.eventsub = EventSubServer(
+            EVENTSUB_SECRET, self.on_eventsub, EVENTSUB_HOST, EVENTSUB_PORT
+        )
+        await self.eventsub.start()
+        if EVENTSUB_CALLBACK:
+            self.sync_eventsub.start()
 
     async def cog_unload(self):
         self.check_stream.cancel()
+        self.refresh_token.cancel()
+        self.push_edits.cancel()
+        self.sync_eventsub.cancel()
+        if self.eventsub:
+            await self.eventsub.stop()
+
+    # -------------------------
+    # Subscriptions
+    # -------------------------
+    def subscriptions(self) -> dict[str, set[int]]:
+        """login -> channel IDs to notify, deduplicated across guilds."""
+        subs: dict[str, set[int]] = {}
+        if TWITCH_USERNAME and NOTIFY_CHANNEL_ID:
+            subs.setdefault(TWITCH_USERNAME, set()).add(NOTIFY_CHANNEL_ID)
 
-    async def get_access_token(self):
-        url = "https://id.twitch.tv/oauth2/token"
+        for cfg in self.store.section(TWITCH).values():
+            channel_id = cfg.get("channel_id")
+            if not channel_id:
+                continue
+            for login in cfg.get("streamers", []):
+                subs.setdefault(login, set()).add(channel_id)
+        return subs
+
+    def drop_channel(self, channel_id: int):
+        """Unset a notification channel the bot can no longer post in."""
+        for gid, cfg in self.store.section(TWITCH).items():
+            if cfg.get("channel_id") == channel_id:
+                cfg.pop("channel_id")
+                self.store.mark_dirty(TWITCH, gid)  # type: ignore
+                print(f"[❌] Dropped Twitch notification channel {channel_id} in guild {gid}")
+
+    # -------------------------
+    # Helix API
+    # -------------------------
+    def token_fresh(self) -> bool:
+        return bool(self.access_token) and time.time() < self.token_expires_at - TOKEN_REFRESH_MARGIN
+
+    async def get_access_token(self, rejected: str | None = None) -> str | None:
+        """
+        Return a usable app token, requesting one only if needed.
+        Pass the token Twitch just rejected to force a refresh; concurrent
+        callers share a single OAuth request.
+        """
+        if self.token_fresh() and self.access_token != rejected:
+            return self.access_token
+
+        if self._token_task is None or self._token_task.done():
+            self._token_task = asyncio.create_task(self._request_token())
+        return await asyncio.shield(self._token_task)
+
+    async def _request_token(self) -> str | None:
         params = {
             "client_id": TWITCH_CLIENT_ID,
             "client_secret": TWITCH_CLIENT_SECRET,
             "grant_type": "client_credentials",
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, params=params) as r:
-                data = await r.json()
-                self.access_token = data.get("access_token")
+        result = await self.bot.http_client.request("POST", TWITCH_TOKEN_URL, params=params)
+        if result.status != 200 or not isinstance(result.data, dict):
+            print(f"[❌] Twitch token request failed: HTTP {result.status}")
+            return None
+
+        self.access_token = result.data["access_token"]
+        self.token_expires_at = time.time() + result.data.get("expires_in", 0)
+        self.store.replace_state(NOTIFIER_STATE, TOKEN_KEY, {
+            "access_token": self.access_token,
+            "expires_at": self.token_expires_at,
+        })
+        return self.access_token
 
-    async def fetch_stream(self):
-        if not self.access_token:
+    @tasks.loop(minutes=10)
+    async def refresh_token(self):
+        # Renew ahead of expiry so polls never hit a 401 for an expired token
+        if not self.token_fresh():
             await self.get_access_token()
 
-        headers = {
-            "Client-ID": TWITCH_CLIENT_ID,
-            "Authorization": f"Bearer {self.access_token}",
-        }
+    async def helix(self, method: str, path: str, **kwargs) -> tuple[int, dict]:
+        """Call a Helix endpoint with the app token. Returns (status, JSON body)."""
+        token = await self.get_access_token()
+        if not token:
+            return 0, {}
+
+        for _ in range(2):
+            headers = {
+                "Client-ID": TWITCH_CLIENT_ID,
+                "Authorization": f"Bearer {token}",
+            }
+            result = await self.bot.http_client.request(
+                method, f"{HELIX_BASE}/{path}", headers=headers, **kwargs
+            )
+            if result.status != 401:
+                data = result.data if isinstance(result.data, dict) else {}
+                return result.status, data
 
-        url = f"https://api.twitch.tv/helix/streams?user_login={TWITCH_USERNAME}"
+            # Revoked early: refresh once and retry right away
+            token = await self.get_access_token(rejected=token)
+            if not token:
+                break
+        return 401, {}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as r:
-                if r.status == 401:
-                    self.access_token = None
-                    return None
+    async def fetch_streams(self, logins: list[str]) -> dict[str, dict] | None:
+        """Live streams for the given logins, in batches of 100. None if a call failed."""
+        live: dict[str, dict] = {}
+        for i in range(0, len(logins), HELIX_BATCH):
+            batch = logins[i:i + HELIX_BATCH]
+            params = [("user_login", login) for login in batch]
+            params.append(("first", str(HELIX_BATCH)))
 
-                data = await r.json()
+            status, data = await self.helix("GET", "streams", params=params)
+            if status != 200:
+                return None
 
-        if not data.get("data"):
-            return None
+            for stream in data.get("data", []):
+                live[stream["user_login"].lower()] = stream
+        return live
+
+    # -------------------------
+    # Notifications
+    # -------------------------
+    @staticmethod
+    def started_at(stream: dict) -> datetime.datetime:
+        return datetime.datetime.fromisoformat(stream["started_at"].replace("Z", "+00:00"))
+
+    def build_embed(self, stream: dict) -> discord.Embed:
+        login = stream["user_login"]
+        url = f"https://twitch.tv/{login}"
+
+        embed = discord.Embed(
+            title="🔴 LIVE ON TWITCH",
+            description=f"**{stream['user_name']}** is now live!",
+            color=discord.Color.purple(),
+            url=url,
+            timestamp=self.started_at(stream),
+        )
 
-        return data["data"][0]
+        embed.add_field(name="🎮 Game", value=stream["game_name"] or "Unknown", inline=True)
+        embed.add_field(name="👥 Viewers", value=f"{stream.get('viewer_count', 0):,}", inline=True)
+        embed.add_field(name="📢 Title", value=stream["title"] or "Untitled", inline=False)
 
-    @tasks.loop(minutes=2)
+        embed.set_thumbnail(
+            url="https://static.twitchcdn.net/assets/favicon-32-e29e246c157142c94346.png"
+        )
+        return embed
+
+    @tasks.loop(seconds=POLL_TICK)
     async def check_stream(self):
-        channel = self.bot.get_channel(NOTIFY_CHANNEL_ID)
-        if not channel:
-            return
+        subs = self.subscriptions()
+        self.scheduler.sync(subs)
 
-        stream = await self.fetch_stream()
+        # Helix is failing: leave everything due until the breaker closes again
+        if not self.bot.http_client.available(HELIX_BASE):
+            return
 
-        if stream and not self.live:
-            self.live = True
+        due = self.scheduler.pop_due()
+        if not due:
+            return
 
-            title = stream["title"]
-            game = stream["game_name"]
-            url = f"https://twitch.tv/{TWITCH_USERNAME}"
+        streams = None
+        try:
+            streams = await self.fetch_streams(sorted(due))
+        finally:
+            if streams is None:
+                for login in due:
+                    self.scheduler.retry(login)
+        if streams is None:
+            return
 
-            embed = discord.Embed(
-                title="🔴 LIVE ON TWITCH",
-                description=f"**{TWITCH_USERNAME}** is now live!",
-                color=discord.Color.purple(),
-                url=url,
-                timestamp=discord.utils.utcnow(),
-            )
+        for login in due:
+            stream = streams.get(login)
+            self.scheduler.report(login, stream is not None)
+            await self.handle_result(login, stream, subs)
 
-            embed.add_field(name="🎮 Game", value=game, inline=True)
-            embed.add_field(name="📢 Title", value=title, inline=False)
+    async def handle_result(self, login: str, stream: dict | None, subs: dict[str, set[int]]):
+        """Shared by polling and EventSub: announce, update or close a login's notification."""
+        if stream is None:
+            self.live.discard(login)
+            # Only close the notification once the offline grace period has passed
+            if time.time() - self.announced.seen.get(login, 0) > self.announced.grace:
+                self.messages.end(login)
+            return
+        self.live.add(login)
 
-            embed.set_thumbnail(
-                url="https://static.twitchcdn.net/assets/favicon-32-e29e246c157142c94346.png"
-            )
+        embed = self.build_embed(stream)
+        if not self.announced.should_announce(login, stream["id"]):
+            self.messages.update(login, embed)
+            return
 
-            await channel.send(embed=embed)  # type: ignore
+        sent = await self.bot.fanout.send(
+            subs.get(login, ()), on_dead=self.drop_channel, embed=embed
+        )
+        self.messages.start(login, self.started_at(stream).timestamp(), embed, sent)
 
-        if not stream:
-            self.live = False
+    @tasks.loop(seconds=10)
+    async def push_edits(self):
+        await self.messages.flush()
 
     @check_stream.before_loop
+    @push_edits.before_loop
     async def before_check_stream(self):
         await self.bot.wait_until_ready()
 
+    # -------------------------
+    # EventSub
+    # -------------------------
+    async def on_eventsub(self, sub_type: str, event: dict):
+        login = event.get("broadcaster_user_login", "").lower()
+        subs = self.subscriptions()
+        if login not in subs:
+            return
+
+        if sub_type == "stream.offline":
+            # Let the poller confirm it, so the offline grace period still applies
+            self.scheduler.poke(login)
+            return
+
+        streams = await self.fetch_streams([login])
+        stream = (streams or {}).get(login)
+        if stream is None:
+            # Helix can lag the webhook by a few seconds; poll again shortly
+            self.scheduler.poke(login, delay=POLL_TICK)
+            return
+        self.scheduler.report(login, True)
+        await self.handle_result(login, stream, subs)
+
+    async def resolve_user_ids(self, logins: list[str]):
+        missing = [login for login in logins if login not in self.user_ids]
+        for i in range(0, len(missing), HELIX_BATCH):
+            params = [("login", login) for login in missing[i:i + HELIX_BATCH]]
+            status, data = await self.helix("GET", "users", params=params)
+            if status != 200:
+                return
+            for user in data.get("data", []):
+                self.user_ids[user["login"].lower()] = user["id"]
+
+    async def list_eventsub(self) -> list[dict]:
+        subscriptions, cursor = [], None
+        while True:
+            params = {"after": cursor} if cursor else {}
+            status, data = await self.helix("GET", "eventsub/subscriptions", params=params)
+            if status != 200:
+                break
+            subscriptions += data.get("data", [])
+            cursor = data.get("pagination", {}).get("cursor")
+            if not cursor:
+                break
+        return [
+            s for s in subscriptions
+            if s["transport"].get("callback") == EVENTSUB_CALLBACK and s["type"] in EVENTSUB_TYPES
+        ]
+
+    @tasks.loop(minutes=10)
+    async def sync_eventsub(self):
+        """Keep one stream.online/offline subscription per watched login."""
+        logins = sorted(self.subscriptions())
+        await self.resolve_user_ids(logins)
+        wanted = {
+            (sub_type, self.user_ids[login])
+            for login in logins if login in self.user_ids
+            for sub_type in EVENTSUB_TYPES
+        }
+
+        existing = {}
+        for sub in await self.list_eventsub():
+            key = (sub["type"], sub["condition"].get("broadcaster_user_id"))
+            if key in wanted and key not in existing and sub["status"] == "enabled":
+                existing[key] = sub
+            else:
+                await self.helix("DELETE", "eventsub/subscriptions", params={"id": sub["id"]})
+
+        for sub_type, user_id in wanted - existing.keys():
+            status, _ = await self.helix("POST", "eventsub/subscriptions", json={
+                "type": sub_type,
+                "version": "1",
+                "condition": {"broadcaster_user_id": user_id},
+                "transport": {
+                    "method": "webhook",
+                    "callback": EVENTSUB_CALLBACK,
+                    "secret": EVENTSUB_SECRET,
+                },
+            })
+            if status not in (202, 409):
+                print(f"[❌] EventSub subscribe failed for {user_id} ({sub_type}): HTTP {status}")
+
+    @sync_eventsub.before_loop
+    async def before_sync_eventsub(self):
+        await self.bot.wait_until_ready()
+
+    # -------------------------
+    # Commands
+    # -------------------------
+    @commands.guild_only()
+    @commands.group(name="twitch", invoke_without_command=True)
+    @commands.has_permissions(manage_guild=True)
+    async def twitch_group(self, ctx: commands.Context):
+        await ctx.send(
+            "Twitch commands:\n"
+            "`!twitch channel #channel`\n"
+            "`!twitch add <login>` / `!twitch remove <login>`\n"
+            "`!twitch list`"
+        )
+
+    @twitch_group.command(name="channel")
+    @commands.has_permissions(manage_guild=True)
+    async def twitch_channel(self, ctx: commands.Context, channel: discord.TextChannel):
+        cfg = self.store.guild(TWITCH, ctx.guild.id)  # type: ignore
+        cfg["channel_id"] = channel.id
+        self.store.mark_dirty(TWITCH, ctx.guild.id)  # type: ignore
+        await ctx.send(f"✅ Twitch notifications will be posted in {channel.mention}")
+
+    @twitch_group.command(name="add")
+    @commands.has_permissions(manage_guild=True)
+    async def twitch_add(self, ctx: commands.Context, login: str):
+        login = login.lower().removeprefix("https://twitch.tv/").strip("/")
+        if not LOGIN_RE.fullmatch(login):
+            return await ctx.send("❌ That's not a Twitch login (letters, digits and `_`, up to 25 characters).")
+        cfg = self.store.guild(TWITCH, ctx.guild.id)  # type: ignore
+        streamers = cfg.setdefault("streamers", [])
+
+        if login in streamers:
+            return await ctx.send(f"⚠️ `{login}` is already on the watch list.")
+        if len(streamers) >= MAX_STREAMERS_PER_GUILD:
+            return await ctx.send(f"❌ Max {MAX_STREAMERS_PER_GUILD} streamers per server.")
+
+        streamers.append(login)
+        self.store.mark_dirty(TWITCH, ctx.guild.id)  # type: ignore
+        msg = f"✅ Now watching `{login}`."
+        if not cfg.get("channel_id"):
+            msg += " Set a channel with `!twitch channel #channel`."
+        await ctx.send(msg)
+
+    @twitch_group.command(name="remove")
+    @commands.has_permissions(manage_guild=True)
+    async def twitch_remove(self, ctx: commands.Context, login: str):
+        login = login.lower()
+        cfg = self.store.guild(TWITCH, ctx.guild.id)  # type: ignore
+        streamers = cfg.setdefault("streamers", [])
+
+        if login not in streamers:
+            return await ctx.send(f"❌ `{login}` is not on the watch list.")
+
+        streamers.remove(login)
+        self.store.mark_dirty(TWITCH, ctx.guild.id)  # type: ignore
+        await ctx.send(f"✅ Stopped watching `{login}`.")
+
+    @twitch_group.command(name="list")
+    @commands.has_permissions(manage_guild=True)
+    async def twitch_list(self, ctx: commands.Context):
+        cfg = self.store.peek(TWITCH, ctx.guild.id) or {}  # type: ignore
+        streamers = cfg.get("streamers", [])
+        channel_id = cfg.get("channel_id")
+
+        embed = discord.Embed(title="📺 Twitch Watch List", color=discord.Color.purple())
+        embed.add_field(
+            name="Channel",
+            value=f"<#{channel_id}>" if channel_id else "❌ Not set",
+            inline=False,
+        )
+
+        # Split the list over as many fields as the per-field limit needs
+        chunks = [""]
+        for s in streamers:
+            line = f"{'🔴' if s in self.live else '⚫'} `{s}`"
+            if chunks[-1] and len(chunks[-1]) + 1 + len(line) > FIELD_LIMIT:
+                chunks.append("")
+            chunks[-1] = f"{chunks[-1]}\n{line}" if chunks[-1] else line
+        for i, chunk in enumerate(chunks):
+            embed.add_field(
+                name=f"Streamers ({len(streamers)})" if i == 0 else "Streamers (cont.)",
+                value=chunk or "None",
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+
 
 async def setup(bot):
     await bot.add_cog(TwitchNotifier(bot))
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import config
 from checks import mod_or_higher
 
 
@@ -36,24 +35,18 @@ class Unban(commands.Cog):
         except discord.HTTPException:
             return await ctx.send("❌ Unban failed due to a Discord error.")
 
-        await ctx.send(f"✅ Unbanned `<{user_id}>`.\nReason: {reason}")
+        case_id = await self.bot.cases.add(ctx.guild.id, "unban", user_id, ctx.author.id, reason)
+        await ctx.send(f"✅ Unbanned `<{user_id}>`. (Case #{case_id})\nReason: {reason}")
 
         # Mod-log
-        modlog_id = config.server_config.get_channel_id(
-            ctx.guild.id, config.MOD_LOG_CHANNEL_ID_KEY
+        embed = discord.Embed(title="User Unbanned", color=discord.Color.green())
+        embed.set_footer(text=f"Case #{case_id}")
+        embed.add_field(name="User ID", value=str(user_id), inline=False)
+        embed.add_field(
+            name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False
         )
-        if modlog_id:
-            channel = ctx.guild.get_channel(modlog_id)
-            if isinstance(channel, discord.TextChannel):
-                embed = discord.Embed(
-                    title="User Unbanned", color=discord.Color.green()
-                )
-                embed.add_field(name="User ID", value=str(user_id), inline=False)
-                embed.add_field(
-                    name="By", value=f"{ctx.author} (`{ctx.author.id}`)", inline=False
-                )
-                embed.add_field(name="Reason", value=reason, inline=False)
-                await channel.send(embed=embed)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        self.bot.modlog.log(ctx.guild, embed)
 
 
 async def setup(bot: commands.Bot):
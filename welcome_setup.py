@@ -1,22 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import ui
-import json
-import os
-
-CONFIG_PATH = "data/welcome_config.json"
-
-
-def load_config():
-    if not os.path.exists(CONFIG_PATH):
-        return {}
-    with open(CONFIG_PATH, "r") as f:
-        return json.load(f)
-
-
-def save_config(data):
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+from config_store import WELCOME
 
 
 class ChannelSelect(ui.Select):
@@ -35,14 +20,11 @@ class ChannelSelect(ui.Select):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        config = load_config()
-        guild_id = str(interaction.guild.id) # type: ignore
-
-        if guild_id not in config:
-            config[guild_id] = {}
+        store = interaction.client.config_store  # type: ignore
+        guild_id = interaction.guild.id # type: ignore
 
-        config[guild_id][self.key] = int(self.values[0])
-        save_config(config)
+        store.guild(WELCOME, guild_id)[self.key] = int(self.values[0])
+        store.mark_dirty(WELCOME, guild_id)
 
         await interaction.response.send_message(
             f"✅ **Channel saved successfully.**",
@@ -95,17 +77,16 @@ class WelcomeSetupView(ui.View):
 
     @ui.button(label="🚀 Post Welcome Message", style=discord.ButtonStyle.primary)
     async def post(self, interaction: discord.Interaction, button: ui.Button):
-        config = load_config()
-        guild_id = str(self.guild.id)
+        cfg = interaction.client.config_store.peek(WELCOME, self.guild.id)  # type: ignore
 
-        if guild_id not in config or "welcome_channel" not in config[guild_id]:
+        if not cfg or "welcome_channel" not in cfg:
             await interaction.response.send_message(
                 "❌ Welcome channel not configured yet.",
                 ephemeral=True
             )
             return
 
-        ch = self.guild.get_channel(config[guild_id]["welcome_channel"])
+        ch = self.guild.get_channel(cfg["welcome_channel"])
 
         embed = discord.Embed(
             title="🎮 Welcome to SX2 Official 🍿🎶",
@@ -119,19 +100,19 @@ class WelcomeSetupView(ui.View):
 
         embed.add_field(
             name="📜 Read the Rules",
-            value=f"Please read <#{config[guild_id].get('rules_channel', 0)}> before chatting.",
+            value=f"Please read <#{cfg.get('rules_channel', 0)}> before chatting.",
             inline=False
         )
 
         embed.add_field(
             name="🎭 Choose Your Roles",
-            value=f"Pick your roles in <#{config[guild_id].get('roles_channel', 0)}>.",
+            value=f"Pick your roles in <#{cfg.get('roles_channel', 0)}>.",
             inline=False
         )
 
         embed.add_field(
             name="👋 Introduce Yourself",
-            value=f"Say hello in <#{config[guild_id].get('intro_channel', 0)}>.",
+            value=f"Say hello in <#{cfg.get('intro_channel', 0)}>.",
             inline=False
         )
 
@@ -1,87 +1,385 @@
 import discord
 from discord.ext import commands, tasks
-import aiohttp
+import datetime
+import math
 import os
+import time
+from zoneinfo import ZoneInfo
+from config_store import NOTIFIER_STATE, YOUTUBE
+from poll_scheduler import PollScheduler
+from announcements import AnnouncementLog
+from live_messages import LiveMessages
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+# Overridable so the poller can be pointed at a local mock server
+YOUTUBE_API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3")
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+
+# Built-in subscription, kept alongside the per-guild watch lists
 CHANNEL_ID = "UCMIR5FKPjkcRvTWtLYOR5Dw"
 NOTIFY_CHANNEL_ID = 1466444174760087914
 
+BASE_INTERVAL = 120      # seconds between polls of an offline channel
+POLL_TICK = 15           # seconds between scheduler checks
+RECENT_UPLOADS = 5       # newest uploads checked per channel
+VIDEOS_BATCH = 50        # max ids per videos.list call
+QUOTA_RESERVE = 0.1      # fraction of the daily quota never planned for
+MAX_CHANNELS_PER_GUILD = 25
+
+# The quota resets at midnight Pacific time
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+QUOTA_KEY = "youtube:quota"
+
+
+class QuotaBudget:
+    """
+    Tracks YouTube Data API units spent today and paces polling to fit the day.
+
+    The day's tally is kept in the notifier state, so a restart picks up where
+    it left off instead of assuming a fresh quota.
+    """
+
+    def __init__(self, daily_units: int, store):
+        self.daily_units = daily_units
+        self.store = store
+        self.state = store.state(NOTIFIER_STATE, QUOTA_KEY)
+        self._roll()
+
+    @property
+    def spent(self) -> int:
+        return self.state.get("spent", 0)
+
+    def _today(self) -> str:
+        return datetime.datetime.now(QUOTA_TZ).date().isoformat()
+
+    def _roll(self):
+        today = self._today()
+        if self.state.get("day") != today:
+            self.state["day"] = today
+            self.state["spent"] = 0
+            self.store.mark_state_dirty(NOTIFIER_STATE, QUOTA_KEY)
+
+    def spend(self, units: int):
+        self._roll()
+        self.state["spent"] += units
+        self.store.mark_state_dirty(NOTIFIER_STATE, QUOTA_KEY)
+
+    def remaining(self) -> int:
+        self._roll()
+        usable = int(self.daily_units * (1 - QUOTA_RESERVE))
+        return max(0, usable - self.spent)
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.datetime.now(QUOTA_TZ)
+        tomorrow = datetime.datetime.combine(
+            now.date() + datetime.timedelta(days=1), datetime.time(), tzinfo=QUOTA_TZ
+        )
+        return (tomorrow - now).total_seconds()
+
+    def interval_for(self, cycle_cost: int, base: float) -> float:
+        """Shortest interval (>= base) at which cycles of this cost last until the reset."""
+        left = self.remaining()
+        until_reset = self.seconds_until_reset()
+        if left < cycle_cost:
+            return max(base, until_reset)
+        return max(base, cycle_cost * until_reset / left)
+
 
 class YouTubeNotifier(commands.Cog):
+    category = "Admin"
+
     def __init__(self, bot):
         self.bot = bot
-        self.live = False
+        self.store = bot.config_store
+        self.quota = QuotaBudget(YOUTUBE_DAILY_QUOTA, bot.config_store)
+        self.scheduler = PollScheduler(
+            bot.config_store, "youtube", base_interval=BASE_INTERVAL
+        )
+        self.live: dict[str, str] = {}    # live video ID -> YouTube channel ID
+        self.announced = AnnouncementLog(bot.config_store, "youtube")
+        self.messages = LiveMessages(bot, bot.config_store, "youtube")
+        # YouTube channel ID -> its recent uploads/ended streams that can't go live again
+        self.settled: dict[str, set[str]] = {}
         self.check_live.start()
+        self.push_edits.start()
 
     async def cog_unload(self):
         self.check_live.cancel()
+        self.push_edits.cancel()
 
-    async def get_live_stream(self):
-        url = (
-            "https://www.googleapis.com/youtube/v3/search"
-            f"?part=snippet&channelId={CHANNEL_ID}"
-            "&eventType=live&type=video"
-            f"&key={YOUTUBE_API_KEY}"
-        )
+    # -------------------------
+    # Subscriptions
+    # -------------------------
+    def subscriptions(self) -> dict[str, set[int]]:
+        """YouTube channel ID -> Discord channel IDs to notify."""
+        subs: dict[str, set[int]] = {}
+        if CHANNEL_ID and NOTIFY_CHANNEL_ID:
+            subs.setdefault(CHANNEL_ID, set()).add(NOTIFY_CHANNEL_ID)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as r:
-                data = await r.json()
+        for cfg in self.store.section(YOUTUBE).values():
+            channel_id = cfg.get("channel_id")
+            if not channel_id:
+                continue
+            for yt_channel in cfg.get("channels", []):
+                subs.setdefault(yt_channel, set()).add(channel_id)
+        return subs
+
+    def drop_channel(self, channel_id: int):
+        """Unset a notification channel the bot can no longer post in."""
+        for gid, cfg in self.store.section(YOUTUBE).items():
+            if cfg.get("channel_id") == channel_id:
+                cfg.pop("channel_id")
+                self.store.mark_dirty(YOUTUBE, gid)  # type: ignore
+                print(f"[❌] Dropped YouTube notification channel {channel_id} in guild {gid}")
+
+    # -------------------------
+    # Data API (1 unit per call)
+    # -------------------------
+    async def api_get(self, resource: str, params: dict) -> dict | None:
+        """GET a Data API resource. None if the call failed (quota, outage, ...)."""
+        params = {**params, "key": YOUTUBE_API_KEY}
+        result = await self.bot.http_client.request(
+            "GET", f"{YOUTUBE_API_BASE}/{resource}", params=params
+        )
+        self.quota.spend(result.attempts)
+        if result.status == 404:
+            return {}  # e.g. a channel without an uploads playlist
+        if not result.ok or not isinstance(result.data, dict):
+            print(f"[❌] YouTube {resource} request failed: HTTP {result.status}")
+            return None
+        return result.data
 
-        if not data.get("items"):
+    async def recent_uploads(self, yt_channel: str) -> list[str] | None:
+        # A channel's uploads playlist is its ID with UC -> UU
+        playlist = "UU" + yt_channel[2:]
+        data = await self.api_get(
+            "playlistItems",
+            {"part": "contentDetails", "playlistId": playlist, "maxResults": RECENT_UPLOADS},
+        )
+        if data is None:
             return None
+        return [item["contentDetails"]["videoId"] for item in data.get("items", [])]
+
+    async def live_videos(self, video_ids: list[str]) -> dict[str, dict] | None:
+        """Look up videos 50 at a time; return the ones that are live right now."""
+        live = {}
+        for i in range(0, len(video_ids), VIDEOS_BATCH):
+            batch = video_ids[i:i + VIDEOS_BATCH]
+            data = await self.api_get(
+                "videos",
+                {"part": "snippet,liveStreamingDetails", "id": ",".join(batch)},
+            )
+            if data is None:
+                return None
+            for video in data.get("items", []):
+                details = video.get("liveStreamingDetails")
+                if details is None or details.get("actualEndTime"):
+                    channel = video["snippet"]["channelId"]
+                    self.settled.setdefault(channel, set()).add(video["id"])
+                elif details.get("actualStartTime"):
+                    live[video["id"]] = video
+        return live
+
+    # -------------------------
+    # Notifications
+    # -------------------------
+    @staticmethod
+    def started_at(video: dict) -> datetime.datetime:
+        start = video["liveStreamingDetails"]["actualStartTime"]
+        return datetime.datetime.fromisoformat(start.replace("Z", "+00:00"))
+
+    def build_embed(self, video: dict) -> discord.Embed:
+        snippet = video["snippet"]
+        video_id = video["id"]
+        title = snippet["title"]
+        channel_name = snippet["channelTitle"]
+        thumbnail = snippet["thumbnails"]["high"]["url"]
+        live_url = f"https://www.youtube.com/watch?v={video_id}"
+
+        embed = discord.Embed(
+            title="🔴 LIVE ON YOUTUBE",
+            description=f"**[{title}]({live_url})**",
+            color=discord.Color.red(),
+            url=live_url,
+            timestamp=self.started_at(video),
+        )
+
+        embed.set_author(
+            name=channel_name,
+            icon_url="https://www.youtube.com/s/desktop/fe2c1c27/img/favicon_144x144.png",
+            url=f"https://www.youtube.com/channel/{snippet['channelId']}",
+        )
 
-        return data["items"][0]
+        embed.set_image(url=thumbnail)
+        embed.add_field(
+            name="📺 Watch Now",
+            value=f"[Click here to join the live stream]({live_url})",
+            inline=False,
+        )
+        viewers = video["liveStreamingDetails"].get("concurrentViewers")
+        if viewers is not None:
+            embed.add_field(name="👥 Viewers", value=f"{int(viewers):,}", inline=True)
+        return embed
 
-    @tasks.loop(minutes=2)
+    async def poll_channels(self, yt_channels: list[str]) -> dict[str, dict] | None:
+        candidates: list[str] = []
+        for yt_channel in yt_channels:
+            uploads = await self.recent_uploads(yt_channel)
+            if uploads is None:
+                return None
+            # Only the newest uploads are ever checked, so older settled IDs can go
+            settled = self.settled.get(yt_channel, set()).intersection(uploads)
+            self.settled[yt_channel] = settled
+            candidates += [v for v in uploads if v not in settled]
+        return await self.live_videos(candidates)
+
+    @tasks.loop(seconds=POLL_TICK)
     async def check_live(self):
-        channel = self.bot.get_channel(NOTIFY_CHANNEL_ID)
-        if not channel:
+        subs = self.subscriptions()
+        self.scheduler.sync(subs)
+        for yt_channel in self.settled.keys() - subs.keys():
+            del self.settled[yt_channel]
+
+        # No channel may be polled faster than the remaining quota allows
+        # if every channel came due in the same cycle
+        cycle_cost = len(subs) + math.ceil(len(subs) * RECENT_UPLOADS / VIDEOS_BATCH)
+        self.scheduler.floor = self.quota.interval_for(cycle_cost, 0)
+
+        # The API is failing: leave everything due until the breaker closes again
+        if not self.bot.http_client.available(YOUTUBE_API_BASE):
             return
 
-        stream = await self.get_live_stream()
+        due = self.scheduler.pop_due()
+        if not due:
+            return
 
-        if stream and not self.live:
-            self.live = True
+        live = None
+        try:
+            live = await self.poll_channels(due)
+        finally:
+            if live is None:
+                for yt_channel in due:
+                    self.scheduler.retry(yt_channel)
+        if live is None:
+            return
 
-            snippet = stream["snippet"]
-            video_id = stream["id"]["videoId"]
-            title = snippet["title"]
-            channel_name = snippet["channelTitle"]
-            thumbnail = snippet["thumbnails"]["high"]["url"]
-            live_url = f"https://www.youtube.com/watch?v={video_id}"
+        live_channels = {video["snippet"]["channelId"] for video in live.values()}
+        for yt_channel in due:
+            self.scheduler.report(yt_channel, yt_channel in live_channels)
 
-            embed = discord.Embed(
-                title="🔴 LIVE ON YOUTUBE",
-                description=f"**[{title}]({live_url})**",
-                color=discord.Color.red(),
-                url=live_url,
-                timestamp=discord.utils.utcnow(),
-            )
+        for video_id, channel in list(self.live.items()):
+            if channel in due and video_id not in live:
+                del self.live[video_id]
 
-            embed.set_author(
-                name=channel_name,
-                icon_url="https://www.youtube.com/s/desktop/fe2c1c27/img/favicon_144x144.png",
-                url=f"https://www.youtube.com/channel/{CHANNEL_ID}",
-            )
+        # Only close a notification once the offline grace period has passed
+        for yt_channel in due:
+            if yt_channel in live_channels:
+                continue
+            if time.time() - self.announced.seen.get(yt_channel, 0) > self.announced.grace:
+                self.messages.end(yt_channel)
 
-            embed.set_image(url=thumbnail)
-            embed.add_field(
-                name="📺 Watch Now",
-                value=f"[Click here to join the live stream]({live_url})",
-                inline=False,
-            )
+        for video_id, video in live.items():
+            yt_channel = video["snippet"]["channelId"]
+            self.live[video_id] = yt_channel
+
+            embed = self.build_embed(video)
+            if not self.announced.should_announce(yt_channel, video_id):
+                self.messages.update(yt_channel, embed)
+                continue
 
-            await channel.send(embed=embed)
+            sent = await self.bot.fanout.send(
+                subs.get(yt_channel, ()), on_dead=self.drop_channel, embed=embed
+            )
+            self.messages.start(yt_channel, self.started_at(video).timestamp(), embed, sent)
 
-        if not stream:
-            self.live = False
+    @tasks.loop(seconds=10)
+    async def push_edits(self):
+        await self.messages.flush()
 
     @check_live.before_loop
+    @push_edits.before_loop
     async def before_check_live(self):
         await self.bot.wait_until_ready()
 
+    # -------------------------
+    # Commands
+    # -------------------------
+    @commands.guild_only()
+    @commands.group(name="youtube", invoke_without_command=True)
+    @commands.has_permissions(manage_guild=True)
+    async def youtube_group(self, ctx: commands.Context):
+        await ctx.send(
+            "YouTube commands:\n"
+            "`!youtube channel #channel`\n"
+            "`!youtube add <channel_id>` / `!youtube remove <channel_id>`\n"
+            "`!youtube list` / `!youtube quota`"
+        )
+
+    @youtube_group.command(name="channel")
+    @commands.has_permissions(manage_guild=True)
+    async def youtube_channel(self, ctx: commands.Context, channel: discord.TextChannel):
+        cfg = self.store.guild(YOUTUBE, ctx.guild.id)  # type: ignore
+        cfg["channel_id"] = channel.id
+        self.store.mark_dirty(YOUTUBE, ctx.guild.id)  # type: ignore
+        await ctx.send(f"✅ YouTube notifications will be posted in {channel.mention}")
+
+    @youtube_group.command(name="add")
+    @commands.has_permissions(manage_guild=True)
+    async def youtube_add(self, ctx: commands.Context, yt_channel: str):
+        if not (yt_channel.startswith("UC") and len(yt_channel) == 24):
+            return await ctx.send("❌ Use the channel ID (starts with `UC`, 24 characters).")
+
+        cfg = self.store.guild(YOUTUBE, ctx.guild.id)  # type: ignore
+        channels = cfg.setdefault("channels", [])
+        if yt_channel in channels:
+            return await ctx.send(f"⚠️ `{yt_channel}` is already on the watch list.")
+        if len(channels) >= MAX_CHANNELS_PER_GUILD:
+            return await ctx.send(f"❌ Max {MAX_CHANNELS_PER_GUILD} channels per server.")
+
+        channels.append(yt_channel)
+        self.store.mark_dirty(YOUTUBE, ctx.guild.id)  # type: ignore
+        await ctx.send(f"✅ Now watching `{yt_channel}`.")
+
+    @youtube_group.command(name="remove")
+    @commands.has_permissions(manage_guild=True)
+    async def youtube_remove(self, ctx: commands.Context, yt_channel: str):
+        cfg = self.store.guild(YOUTUBE, ctx.guild.id)  # type: ignore
+        channels = cfg.setdefault("channels", [])
+        if yt_channel not in channels:
+            return await ctx.send(f"❌ `{yt_channel}` is not on the watch list.")
+
+        channels.remove(yt_channel)
+        self.store.mark_dirty(YOUTUBE, ctx.guild.id)  # type: ignore
+        await ctx.send(f"✅ Stopped watching `{yt_channel}`.")
+
+    @youtube_group.command(name="list")
+    @commands.has_permissions(manage_guild=True)
+    async def youtube_list(self, ctx: commands.Context):
+        cfg = self.store.peek(YOUTUBE, ctx.guild.id) or {}  # type: ignore
+        channels = cfg.get("channels", [])
+        channel_id = cfg.get("channel_id")
+
+        embed = discord.Embed(title="📺 YouTube Watch List", color=discord.Color.red())
+        embed.add_field(
+            name="Channel",
+            value=f"<#{channel_id}>" if channel_id else "❌ Not set",
+            inline=False,
+        )
+        embed.add_field(
+            name=f"Channels ({len(channels)})",
+            value="\n".join(f"`{c}`" for c in channels) or "None",
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+
+    @youtube_group.command(name="quota")
+    @commands.has_permissions(manage_guild=True)
+    async def youtube_quota(self, ctx: commands.Context):
+        await ctx.send(
+            f"📊 YouTube quota today: **{self.quota.spent}** / {self.quota.daily_units} units used, "
+            f"each channel polled at most every **{int(self.scheduler.floor or BASE_INTERVAL)}s**."
+        )
+
 
 async def setup(bot):
     await bot.add_cog(YouTubeNotifier(bot))